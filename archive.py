@@ -0,0 +1,122 @@
+import mmap, os, struct, sys
+from array import array
+
+from metrics import add_io_bytes
+from records import ScoreRecord
+from storage import atomic_write
+
+# File layout, one file per closed week (<week_start>.gqw), little-endian:
+#   header   magic "GQWK", version u32, row count n u64           (16 bytes)
+#   columns  user_id i64[n], phase1 i64[n], phase2 i64[n]         (sorted by user_id)
+#   names    usernames, UTF-8, "\n"-separated, same order
+# The numeric columns sit at fixed offsets, so a reader can mmap the file and
+# use them in place without parsing anything.
+MAGIC = b"GQWK"
+VERSION = 1
+HEADER = struct.Struct("<4sIQ")
+SUFFIX = ".gqw"
+_LITTLE = sys.byteorder == "little"
+
+
+class ArchivedWeek:
+    """One archived week, memory-mapped. Columns are read-only int views."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"not a week archive: {path}")
+        self.n = n
+        self._views = []
+        off = HEADER.size
+        self.user_ids, self.phase1, self.phase2 = (self._column(off + i * 8 * n, n) for i in range(3))
+        names = self._mm[off + 24 * n:].decode("utf-8")
+        self.names = names.split("\n") if n else []
+
+    def _column(self, offset, n):
+        base = memoryview(self._mm)
+        raw = base[offset:offset + 8 * n]
+        if _LITTLE:
+            col = raw.cast("q")
+            self._views += [base, raw, col]
+            return col
+        col = array("q", raw)
+        col.byteswap()
+        raw.release()
+        base.release()
+        return col
+
+    def rows(self, week_start: str):
+        return [ScoreRecord(self.user_ids[i], self.names[i], week_start, self.phase1[i], self.phase2[i])
+                for i in range(self.n)]
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class WeekArchive:
+    """
+    Append-only store of closed weeks, one columnar file per week, written
+    by the weekly rollover. If a week is archived again (late changes that
+    reached the hot store), its file is replaced atomically by the merge.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._weeks = None
+
+    def path(self, week_start: str):
+        return os.path.join(self.directory, week_start + SUFFIX)
+
+    def weeks(self):
+        if self._weeks is None:
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                names = []
+            self._weeks = sorted(n[:-len(SUFFIX)] for n in names if n.endswith(SUFFIX))
+        return self._weeks
+
+    def open_week(self, week_start: str):
+        return ArchivedWeek(self.path(week_start))
+
+    def read_week(self, week_start: str):
+        if week_start not in self.weeks():
+            return []
+        with self.open_week(week_start) as wk:
+            add_io_bytes("archive_read", read=HEADER.size + 24 * wk.n)
+            return wk.rows(week_start)
+
+    def write_week(self, week_start: str, rows):
+        """Archive `rows` for a week, overlaying any rows already archived for it."""
+        merged = {r.user_id: r for r in self.read_week(week_start)}
+        for r in rows:
+            merged[r.user_id] = r
+        ordered = [merged[uid] for uid in sorted(merged)]
+        cols = [array("q", (getattr(r, k) for r in ordered)) for k in ("user_id", "phase1", "phase2")]
+        if not _LITTLE:
+            for col in cols:
+                col.byteswap()
+        names = "\n".join(str(r.username).replace("\n", " ") for r in ordered).encode("utf-8")
+
+        def write(f):
+            f.write(HEADER.pack(MAGIC, VERSION, len(ordered)))
+            for col in cols:
+                col.tofile(f)
+            f.write(names)
+
+        os.makedirs(self.directory, exist_ok=True)
+        atomic_write(self.path(week_start), write, "archive_write", binary=True)
+        self._weeks = None
+        return len(ordered)
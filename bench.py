@@ -0,0 +1,230 @@
+"""
+Load test / micro-benchmark for the bot's command handlers.
+
+Imports the command callbacks from main.py and drives them with fake ctx
+objects against generated data files in a temp directory, no Discord needed.
+
+    python bench.py                              # 10k/100k/1M score rows, csv backend
+    python bench.py --rows 10000 --backend sqlite
+    python bench.py --users 500 --concurrency 50
+
+Each (backend, rows) pair runs in a fresh subprocess so module-level caches
+start cold. Reported per scenario: p50/p95/p99 handler latency, throughput,
+and bytes read/written per command (from /proc/self/io, Linux only).
+"""
+import argparse, asyncio, csv, json, os, shutil, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ========= FAKE DISCORD CONTEXT =========
+class FakeAuthor:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    """The home guild (HOME_GUILD_ID), so commands use the generated top-level files."""
+
+    id = 1
+
+    def get_member(self, user_id):
+        return None
+
+
+class FakeCtx:
+    """Just enough of commands.Context for the handlers: author, guild and send()."""
+
+    def __init__(self, user_id: int):
+        self.author = FakeAuthor(user_id)
+        self.guild = FakeGuild()
+        self.interaction = None
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+
+
+# ========= DATA GENERATION =========
+def write_scores(path: str, rows: int, week_start: str, users: int):
+    """`rows` score rows: the current week for `users` users, the rest spread over past weeks."""
+    import datetime
+    monday = datetime.date.fromisoformat(week_start)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["user_id", "username", "week_start", "phase1", "phase2", "total"])
+        current = min(rows, users)
+        for i in range(current):
+            p1, p2 = (i * 7919) % 10**9, (i * 104729) % 10**9
+            w.writerow([100000 + i, f"user{100000 + i}", week_start, p1, p2, p1 + p2])
+        past = rows - current
+        per_week = max(users, 1)
+        for i in range(past):
+            week = (monday - datetime.timedelta(days=7 * (1 + i // per_week))).isoformat()
+            uid = 100000 + i % per_week
+            p1, p2 = (i * 31) % 10**9, (i * 37) % 10**9
+            w.writerow([uid, f"user{uid}", week, p1, p2, p1 + p2])
+
+
+def io_counters():
+    try:
+        with open("/proc/self/io") as f:
+            vals = dict(line.split(": ") for line in f.read().splitlines())
+        return int(vals["rchar"]), int(vals["wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, max(0, round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[i]
+
+
+# ========= SCENARIOS =========
+async def run_scenario(name, calls, concurrency, after_burst=None):
+    """
+    Run `calls` (zero-arg coroutine factories) in bursts of `concurrency`,
+    awaiting `after_burst()` between bursts (counted in throughput and I/O,
+    not in per-command latency).
+    """
+    latencies = []
+
+    async def timed(fn):
+        t0 = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - t0)
+
+    r0, w0 = io_counters()
+    t0 = time.perf_counter()
+    for i in range(0, len(calls), concurrency):
+        await asyncio.gather(*(timed(fn) for fn in calls[i:i + concurrency]))
+        if after_burst is not None:
+            await after_burst()
+    wall = time.perf_counter() - t0
+    r1, w1 = io_counters()
+    latencies.sort()
+    n = len(latencies) or 1
+    return {
+        "scenario": name,
+        "calls": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "ops_per_s": len(latencies) / wall if wall else 0.0,
+        "read_per_cmd": (r1 - r0) / n,
+        "written_per_cmd": (w1 - w0) / n,
+    }
+
+
+async def bench_worker(args):
+    import main
+
+    phase = args.phase
+    users = [200000 + i for i in range(args.users)]
+    results = []
+
+    async def flush():
+        # flush_storage isn't running here; flush write-behind changes once per
+        # burst like it would, so the rewrite cost shows up in written_per_cmd.
+        for gs in main.guilds.loaded():
+            await gs.dal.flush()
+
+    # Many users submitting at phase close.
+    results.append(await run_scenario("submit burst", [
+        (lambda u=u: main.submitp1.callback(FakeCtx(u), str(u * 13 % 10**9)))
+        for u in users
+    ], args.concurrency, flush))
+
+    # Reroll storm at Mon 19:00: everyone rolls a team, then a side.
+    results.append(await run_scenario("reroll storm", [
+        (lambda u=u: main.rerollteam.callback(FakeCtx(u), phase=phase))
+        for u in users
+    ], args.concurrency, flush))
+    results.append(await run_scenario("reroll side1", [
+        (lambda u=u: main.rerollside1.callback(FakeCtx(u), phase=phase))
+        for u in users
+    ], args.concurrency, flush))
+
+    # !leaderboard spam.
+    results.append(await run_scenario("leaderboard spam", [
+        (lambda u=u: main.leaderboard.callback(FakeCtx(u)))
+        for u in users
+    ], args.concurrency, flush))
+
+    results.append(await run_scenario("myscore", [
+        (lambda u=u: main.myscore.callback(FakeCtx(u)))
+        for u in users
+    ], args.concurrency, flush))
+
+    main.io_executor.shutdown(wait=True)
+    main.guilds.close()
+    return results
+
+
+def worker(args):
+    workdir = tempfile.mkdtemp(prefix="gq-bench-")
+    try:
+        shutil.copy(os.path.join(HERE, "units.csv"), workdir)
+        os.chdir(workdir)
+        sys.path.insert(0, HERE)
+        os.environ["STORAGE_BACKEND"] = args.backend
+        os.environ["HOME_GUILD_ID"] = str(FakeGuild.id)
+        os.environ.setdefault("ROLL_SEED", "0")
+
+        import datetime
+        from zoneinfo import ZoneInfo
+        now = datetime.datetime.now(ZoneInfo("Asia/Dubai"))
+        monday = now.date() - datetime.timedelta(days=now.weekday())
+        if now < datetime.datetime.combine(monday, datetime.time(19, 0), tzinfo=now.tzinfo):
+            monday -= datetime.timedelta(days=7)
+        write_scores("scores.csv", args.rows, monday.isoformat(), args.users)
+        if args.backend == "sqlite":
+            from storage import migrate_csv_to_sqlite
+            migrate_csv_to_sqlite("scores.csv", "current_teams.csv", "phases.json", "gq.sqlite3")
+
+        print(json.dumps(asyncio.run(bench_worker(args))))
+    finally:
+        os.chdir(HERE)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--rows", default="10000,100000,1000000", help="comma-separated scores.csv sizes")
+    p.add_argument("--backend", default="csv", help="comma-separated storage backends (csv, sqlite)")
+    p.add_argument("--users", type=int, default=200, help="distinct users per scenario")
+    p.add_argument("--concurrency", type=int, default=25, help="commands in flight per burst")
+    p.add_argument("--phase", default="Soul Reaper Melee")
+    p.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.worker:
+        args.rows = int(args.rows)
+        worker(args)
+        return
+
+    header = f"{'backend':8} {'rows':>9} {'scenario':18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'read/cmd':>11} {'write/cmd':>11}"
+    print(header)
+    print("-" * len(header))
+    for backend in args.backend.split(","):
+        for rows in args.rows.split(","):
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", "--rows", rows, "--backend", backend,
+                   "--users", str(args.users), "--concurrency", str(args.concurrency), "--phase", args.phase]
+            out = subprocess.run(cmd, capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{backend:8} {rows:>9} FAILED\n{out.stderr}")
+                continue
+            for r in json.loads(out.stdout.strip().splitlines()[-1]):
+                print(f"{backend:8} {int(rows):>9} {r['scenario']:18} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} "
+                      f"{r['p99_ms']:9.2f} {r['ops_per_s']:9.1f} {r['read_per_cmd']:11.0f} {r['written_per_cmd']:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
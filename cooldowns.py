@@ -0,0 +1,86 @@
+import heapq, json, math, os, time
+
+from storage import atomic_write
+
+
+class CooldownStore:
+    """
+    Per-bucket command cooldowns keyed by (bucket, user_id).
+
+    Deadlines use the monotonic clock. Expired entries are dropped from an
+    expiry heap as time passes, and the table never holds more than
+    `max_entries` (the entries closest to expiring are evicted first).
+    snapshot()/restore() carry the remaining time across restarts.
+    """
+
+    def __init__(self, durations: dict, max_entries: int = 50_000, clock=time.monotonic):
+        self.durations = dict(durations)  # bucket -> seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._deadlines = {}
+        self._heap = []  # (deadline, bucket, user_id); stale items are skipped lazily
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _purge(self, now):
+        heap = self._heap
+        while heap and (heap[0][0] <= now or len(self._deadlines) > self.max_entries):
+            deadline, bucket, user_id = heapq.heappop(heap)
+            if self._deadlines.get((bucket, user_id)) == deadline:
+                del self._deadlines[(bucket, user_id)]
+        # Re-pushed keys leave stale heap items behind; rebuild if they pile up.
+        if len(heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(d, b, u) for (b, u), d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _set(self, bucket, user_id, deadline):
+        self._deadlines[(bucket, user_id)] = deadline
+        heapq.heappush(self._heap, (deadline, bucket, user_id))
+
+    def check(self, user_id: int, bucket: str):
+        """
+        Returns minutes left (rounded up) if the user is still cooling down.
+        Otherwise starts a new cooldown and returns 0.
+        """
+        now = self.clock()
+        self._purge(now)
+        deadline = self._deadlines.get((bucket, user_id))
+        if deadline is not None and deadline > now:
+            return math.ceil((deadline - now) / 60)
+        self._set(bucket, user_id, now + self.durations[bucket])
+        self._purge(now)
+        return 0
+
+    # ----- persistence -----
+    def snapshot(self):
+        """JSON-able dump with remaining seconds, anchored to wall-clock time."""
+        now = self.clock()
+        self._purge(now)
+        return {
+            "saved_at": time.time(),
+            "entries": [[b, u, round(d - now, 3)] for (b, u), d in self._deadlines.items()],
+        }
+
+    def restore(self, data: dict):
+        now = self.clock()
+        elapsed = max(0.0, time.time() - float(data.get("saved_at", 0)))
+        for bucket, user_id, remaining in data.get("entries", []):
+            remaining = float(remaining) - elapsed
+            if bucket in self.durations and remaining > 0:
+                self._set(bucket, int(user_id), now + min(remaining, self.durations[bucket]))
+        self._purge(now)
+
+
+def save_snapshot(path: str, data: dict):
+    atomic_write(path, lambda f: json.dump(data, f))
+
+
+def load_snapshot(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
@@ -0,0 +1,131 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+
+from metrics import call_io
+
+
+class IoExecutor(ThreadPoolExecutor):
+    """
+    The shared I/O pool. While `wrap` is set every job is submitted as
+    wrap(fn); the CPU profiler uses it to trace the worker threads.
+    """
+    wrap = None
+
+    def submit(self, fn, /, *args, **kwargs):
+        wrap = self.wrap
+        return super().submit(fn if wrap is None else wrap(fn), *args, **kwargs)
+
+
+def make_io_executor(size: int):
+    return IoExecutor(max_workers=max(1, size), thread_name_prefix="gq-io")
+
+
+class DataAccess:
+    """
+    Async front for a StorageBackend. Every call runs on the bounded I/O
+    executor while holding the asyncio lock of the file it touches, so two
+    commands can never interleave a read-modify-write on the same file.
+    """
+
+    def __init__(self, storage, executor, locks=None):
+        self.storage = storage
+        self.executor = executor
+        self._locks = {} if locks is None else locks
+
+    def _lock(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def run_blocking(self, fn, *args):
+        """Run any blocking callable on the I/O executor (no file lock)."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(fn, *args))
+
+    async def _submit(self, kind, fn, *args):
+        async with self._lock(self.storage.lock_key(kind)):
+            return await self.run_blocking(call_io, fn.__name__, fn, *args)
+
+    @asynccontextmanager
+    async def locked(self, kind):
+        """
+        Hold the lock for `kind` across several calls:
+            async with dal.locked("teams") as tx:
+                team = await tx.load_team(...)
+                await tx.save_team(...)
+        """
+        key = self.storage.lock_key(kind)
+        async with self._lock(key):
+            yield _LockedSession(self.storage, self.executor, self._locks, key)
+
+    # ----- scores -----
+    async def get_score(self, user_id, week_start):
+        return await self._submit("scores", self.storage.get_score, user_id, week_start)
+
+    async def save_phase_score(self, user_id, username, week_start, slot, value):
+        return await self._submit("scores", self.storage.save_phase_score, user_id, username, week_start, slot, value)
+
+    async def week_scores(self, week_start):
+        return await self._submit("scores", self.storage.week_scores, week_start)
+
+    async def bulk_upsert_scores(self, week_start, entries):
+        return await self._submit("scores", self.storage.bulk_upsert_scores, week_start, entries)
+
+    async def export_scores(self, path, week_start=None, since=None):
+        return await self._submit("scores", self.storage.export_scores, path, week_start, since)
+
+    async def all_scores(self):
+        return await self._submit("scores", self.storage.all_scores)
+
+    async def archive_weeks(self, before):
+        return await self._submit("scores", self.storage.archive_weeks, before)
+
+    # ----- teams -----
+    async def load_team(self, user_id, phase_name):
+        return await self._submit("teams", self.storage.load_team, user_id, phase_name)
+
+    async def save_team(self, user_id, username, phase_name, lead, side1, side2):
+        return await self._submit("teams", self.storage.save_team, user_id, username, phase_name, lead, side1, side2)
+
+    async def load_teams(self, user_ids, phase_name):
+        return await self._submit("teams", self.storage.load_teams, user_ids, phase_name)
+
+    async def save_teams(self, phase_name, entries):
+        return await self._submit("teams", self.storage.save_teams, phase_name, entries)
+
+    async def clear_teams(self, keep_phases=()):
+        return await self._submit("teams", self.storage.clear_teams, keep_phases)
+
+    # ----- phases -----
+    async def load_phases(self):
+        return await self._submit("phases", self.storage.load_phases)
+
+    async def save_phases(self, phases_map):
+        return await self._submit("phases", self.storage.save_phases, phases_map)
+
+    async def set_week_phases(self, week_start, phase1, phase2):
+        return await self._submit("phases", self.storage.set_week_phases, week_start, phase1, phase2)
+
+    async def flush(self):
+        """Write whatever a write-behind backend is holding back, one file at a time."""
+        for kind in self.storage.pending():
+            await self._submit(kind, self.storage.flush, kind)
+
+    def close(self):
+        """Close the backend; the executor is shared and shut down by its owner."""
+        self.storage.close()
+
+
+class _LockedSession(DataAccess):
+    """DataAccess view used inside `locked()`; skips re-acquiring the held lock."""
+
+    def __init__(self, storage, executor, locks, held_key):
+        super().__init__(storage, executor, locks)
+        self._held_key = held_key
+
+    async def _submit(self, kind, fn, *args):
+        if self.storage.lock_key(kind) == self._held_key:
+            return await self.run_blocking(call_io, fn.__name__, fn, *args)
+        return await super()._submit(kind, fn, *args)
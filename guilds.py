@@ -0,0 +1,116 @@
+import asyncio, json, os
+
+from cooldowns import load_snapshot, save_snapshot
+from storage import atomic_write
+
+
+class GuildState:
+    """
+    One guild's partition: its own storage files, leaderboards, phases
+    schedule cache, cooldowns, roll history, admin list and the last
+    Mon/Thu team reset it went through.
+    """
+
+    def __init__(self, guild_id, data_dir, dal, boards, schedule, cooldowns, history,
+                 cooldown_file, admins_file, history_file, rollover_file):
+        self.guild_id = guild_id
+        self.data_dir = data_dir
+        self.dal = dal
+        self.boards = boards
+        self.schedule = schedule
+        self.cooldowns = cooldowns
+        self.history = history
+        self.cooldown_file = cooldown_file
+        self.admins_file = admins_file
+        self.history_file = history_file
+        self.rollover_file = rollover_file
+        self.admins = set()
+        self.last_rollover = None  # (week_start, phase slot)
+
+    def load(self):
+        """Blocking: restore cooldowns, roll history, the admin list and the last rollover from disk."""
+        saved = load_snapshot(self.cooldown_file)
+        if saved:
+            self.cooldowns.restore(saved)
+        self.history.load(self.history_file)
+        if os.path.exists(self.admins_file):
+            try:
+                with open(self.admins_file, "r", encoding="utf-8") as f:
+                    self.admins = {int(x) for x in json.load(f)}
+            except Exception:
+                self.admins = set()
+        if os.path.exists(self.rollover_file):
+            try:
+                with open(self.rollover_file, "r", encoding="utf-8") as f:
+                    self.last_rollover = tuple(json.load(f))
+            except Exception:
+                self.last_rollover = None
+
+    def save_admins(self):
+        admins = sorted(self.admins)
+        atomic_write(self.admins_file, lambda f: json.dump(admins, f))
+
+    def save_rollover(self, week_start, slot):
+        self.last_rollover = (week_start, slot)
+        atomic_write(self.rollover_file, lambda f: json.dump([week_start, slot], f))
+
+    def take_snapshot(self):
+        """
+        Copy out the cooldowns and (if changed) the roll history to save. Call
+        it on the event loop thread, which is the one mutating them; only
+        write_snapshot() belongs on the executor.
+        """
+        history = None
+        if self.history.dirty:
+            history = self.history.to_json()
+            self.history.dirty = False
+        return self.cooldowns.snapshot(), history
+
+    def write_snapshot(self, snap):
+        """Blocking: write what take_snapshot() returned."""
+        cooldowns, history = snap
+        save_snapshot(self.cooldown_file, cooldowns)
+        if history is not None:
+            self.history.write(self.history_file, history)
+
+    def snapshot(self):
+        self.write_snapshot(self.take_snapshot())
+
+    def close(self):
+        self.snapshot()
+        self.dal.close()
+
+
+class GuildRegistry:
+    """
+    Opens GuildStates lazily, on the I/O executor, the first time a guild is
+    seen. `opener(key)` builds and loads the state for a partition key.
+    """
+
+    def __init__(self, opener, executor):
+        self.opener = opener
+        self.executor = executor
+        self._states = {}
+        self._opening = {}
+
+    async def get(self, key):
+        state = self._states.get(key)
+        if state is not None:
+            return state
+        fut = self._opening.get(key)
+        if fut is None:
+            fut = self._opening[key] = asyncio.get_running_loop().run_in_executor(self.executor, self.opener, key)
+        try:
+            state = await fut
+        finally:
+            self._opening.pop(key, None)
+        self._states[key] = state
+        return state
+
+    def loaded(self):
+        return list(self._states.values())
+
+    def close(self):
+        for state in self._states.values():
+            state.close()
+        self._states.clear()
@@ -1,16 +1,84 @@
-from flask import Flask, Response
+import json, math, time
 from threading import Thread
 from datetime import datetime
 
-app = Flask("keep_alive")
+from metrics import registry
 
-@app.route("/ping-x92a7f", methods=["GET", "HEAD"])
-def ping():
-    print(f"[{datetime.utcnow()}] Ping received!")
-    return Response("Bot is alive!", status=200)
+PING_ROUTE = "/ping-x92a7f"
 
-def keep_alive():
+
+# ========= FLASK MODE (dev server in a thread) =========
+def _flask_app():
+    from flask import Flask, Response
+
+    app = Flask("keep_alive")
+
+    @app.route(PING_ROUTE, methods=["GET", "HEAD"])
+    def ping():
+        print(f"[{datetime.utcnow()}] Ping received!")
+        return Response("Bot is alive!", status=200)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(registry.render(), status=200, mimetype="text/plain; version=0.0.4")
+
+    return app
+
+def keep_alive(port: int = 8080):
     # Run Flask in a separate thread so Discord bot can run concurrently
-    server = Thread(target=lambda: app.run(host="0.0.0.0", port=8080))
+    app = _flask_app()
+    server = Thread(target=lambda: app.run(host="0.0.0.0", port=port))
     server.daemon = True  # Thread will close when main program exits
     server.start()
+
+
+# ========= ASYNC MODE (aiohttp on the bot's event loop) =========
+async def start_async_keep_alive(bot, port: int = 8080, host: str = "0.0.0.0"):
+    """
+    Serve the ping route plus /healthz, /readyz and /metrics from the bot's
+    own event loop. Returns the aiohttp AppRunner; call `await runner.cleanup()`
+    on shutdown.
+    """
+    from aiohttp import web
+
+    last_event = {"at": None}
+
+    async def on_socket_event_type(event_type):
+        last_event["at"] = time.monotonic()
+
+    bot.add_listener(on_socket_event_type)
+
+    def health():
+        latency = bot.latency
+        at = last_event["at"]
+        return {
+            "ready": bot.is_ready() and not bot.is_closed(),
+            "gateway_latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            "last_event_age_s": round(time.monotonic() - at, 1) if at is not None else None,
+            "guilds": len(bot.guilds),
+        }
+
+    async def ping(request):
+        return web.Response(text="Bot is alive!")
+
+    async def healthz(request):
+        return web.Response(text=json.dumps(health()), content_type="application/json")
+
+    async def readyz(request):
+        info = health()
+        ok = info["ready"] and info["gateway_latency_ms"] is not None
+        return web.Response(text=json.dumps(info), status=200 if ok else 503, content_type="application/json")
+
+    async def metrics(request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get(PING_ROUTE, ping)  # add_get also answers HEAD
+    app.router.add_get("/healthz", healthz)
+    app.router.add_get("/readyz", readyz)
+    app.router.add_get("/metrics", metrics)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -1,16 +1,30 @@
-from keep_alive import keep_alive
-keep_alive()
-
+from keep_alive import keep_alive, start_async_keep_alive
 import discord
-from discord.ext import commands
-import csv, os, json
+from discord import app_commands
+from discord.ext import commands, tasks
+import asyncio, csv, io, os, tempfile
 from datetime import datetime, timedelta, time
 from zoneinfo import ZoneInfo
 import re
-import math
-import random
-
-# List of Discord IDs allowed to use admin commands
+from time import perf_counter
+
+from archive import WeekArchive
+from cooldowns import CooldownStore
+from data_access import DataAccess, make_io_executor
+from guilds import GuildRegistry, GuildState
+from metrics import registry as metrics
+from outbox import Outbox
+from profiling import CpuProfile, MemoryProfile
+from ranking import Leaderboards
+from records import unit_ids
+from roll_history import SLOTS, RollHistory
+from sampler import Sampler
+from schedule import ScheduleCache
+from storage import open_storage
+from units import UnitCatalog
+
+# List of Discord IDs allowed to use admin commands in every guild
+# (each guild can add its own admins with !addadmin)
 ADMINS = [1301523585634144318]  # <-- replace with your Discord user ID
 
 
@@ -20,41 +34,169 @@ COMMAND_PREFIX = "!"
 UAETZ = ZoneInfo("Asia/Dubai")
 
 COOLDOWN = timedelta(minutes=5)
-
+COOLDOWNS = {  # per-bucket overrides of COOLDOWN
+    "team": COOLDOWN,
+    "lead": COOLDOWN,
+    "side1": COOLDOWN,
+    "side2": COOLDOWN,
+}
+COOLDOWN_MAX_ENTRIES = 50_000       # hard cap on remembered (bucket, user) cooldowns
+COOLDOWN_FILE = "cooldowns.json"    # snapshot so a restart doesn't reset cooldowns
+COOLDOWN_SNAPSHOT_SECONDS = 60
+
+# Each guild gets its own copy of these files under DATA_DIR/guilds/<guild_id>/.
+# HOME_GUILD_ID keeps using the top-level files so existing data stays put; the bot
+# refuses to start if those files exist and HOME_GUILD_ID is unset. DMs get their own
+# partition: they only arrive on shard 0, so with SHARD_IDS split across processes the
+# home guild's files may belong to another process.
+DATA_DIR = os.environ.get("DATA_DIR", "data")
+HOME_GUILD_ID = int(os.environ.get("HOME_GUILD_ID") or 0) or None
 SCORES_FILE = "scores.csv"
 TEAMS_FILE = "current_teams.csv"
 PHASES_FILE = "phases.json"   # maps week_start -> {"phase1": "...", "phase2": "..."}
 UNITS_FILE = "units.csv"      # Phase,Affiliation,Range(0/1),Role(Lead/Side),UnitName
+UNITS_WATCH_SECONDS = 30      # how often units.csv is checked for changes (autocomplete index)
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "csv")  # "csv" or "sqlite"
+SQLITE_FILE = "gq.sqlite3"    # used when STORAGE_BACKEND=sqlite; fill it with `python storage.py migrate`
+ADMINS_FILE = "admins.json"   # per-guild admins added with !addadmin
+ARCHIVE_DIR = "archive"       # closed weeks, one columnar .gqw file each (see archive.py)
+ARCHIVE_KEEP_WEEKS = 1        # closed weeks kept in the hot store for late corrections
+ROLLOVER_FILE = "rollover.json"  # last Mon/Thu team reset done, so a guild loaded later catches up
+IMPORT_MAX_BYTES = 8 * 1024 * 1024  # largest !importscores attachment accepted
+IMPORT_CHUNK_BYTES = 64 * 1024      # attachment download chunk; above 1 MiB it spools to disk
+# CSV backend: changes are kept in memory and flushed (atomically) this often and on
+# shutdown, so a burst of commands costs one rewrite. 0 writes every change straight away.
+WRITE_BEHIND_SECONDS = float(os.environ.get("WRITE_BEHIND_SECONDS", "2"))
+IO_POOL_SIZE = int(os.environ.get("IO_POOL_SIZE", "4"))  # threads for blocking file/database work
+KEEP_ALIVE_MODE = os.environ.get("KEEP_ALIVE_MODE", "flask")  # "flask" (thread), "async" (bot loop) or "off"
+KEEP_ALIVE_PORT = int(os.environ.get("KEEP_ALIVE_PORT", "8080"))
+SEASON_START = os.environ.get("SEASON_START", "")  # first week_start (YYYY-MM-DD) counted in season totals
+ROLL_SEED = os.environ.get("ROLL_SEED")  # set to make rolls reproducible (tests/benchmarks)
+# No-repeat history: a reroll never gives back your last unit for that slot, and
+# avoids the ones before it (up to the depth) while the pool has other options.
+ROLL_HISTORY_DEPTH = int(os.environ.get("ROLL_HISTORY_DEPTH", "3"))
+ROLL_HISTORY_DEPTHS = {  # per-phase overrides, lowercase phase name -> depth
+    # "stern ritter ranged": 1,
+}
+ROLL_HISTORY_CAPACITY = 8         # deepest history kept per slot
+ROLL_HISTORY_MAX_USERS = 20_000   # per guild; least recently rolling users are forgotten first
+ROLL_HISTORY_FILE = "roll_history.json"
+# Outbound replies: paced per channel under Discord's send limit; during a burst
+# (OUTBOX_COALESCE_AT+ replies waiting) short reroll results are merged into one embed.
+OUTBOX_RATE, OUTBOX_PER = 5, 5.0
+OUTBOX_COALESCE_AT = 3
+# Sharding: leave both unset to let discord.py pick the shard count. To split
+# shards across processes, give every process the same SHARD_COUNT and its own SHARD_IDS ("0,1").
+SHARD_COUNT = int(os.environ.get("SHARD_COUNT") or 0) or None
+SHARD_IDS = [int(x) for x in os.environ.get("SHARD_IDS", "").split(",") if x.strip()] or None
+
+# !rollteams @Role needs the role's member list: set MEMBERS_INTENT=1 and enable the
+# Server Members intent in the developer portal. Without it only cached members are seen.
+MEMBERS_INTENT = os.environ.get("MEMBERS_INTENT", "0") == "1"
+ROLLTEAMS_PAGE_SIZE = 15       # members per page of the !rollteams summary
+ROLLTEAMS_PAGE_TIMEOUT = 600   # seconds the page buttons stay live
 
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix=COMMAND_PREFIX, intents=intents)
-
-# ========= UTIL: FILES =========
-def ensure_scores_file():
-    if not os.path.exists(SCORES_FILE):
-        with open(SCORES_FILE, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["user_id", "username", "week_start", "phase1", "phase2", "total"])
-
-def ensure_teams_file():
-    if not os.path.exists(TEAMS_FILE):
-        with open(TEAMS_FILE, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["user_id","username","phase","lead","side1","side2","updated_at"])
-
-def load_phases_map():
-    if not os.path.exists(PHASES_FILE):
-        return {}
-    try:
-        with open(PHASES_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-def save_phases_map(d):
-    with open(PHASES_FILE, "w", encoding="utf-8") as f:
-        json.dump(d, f, ensure_ascii=False, indent=2)
+intents.members = MEMBERS_INTENT
+
+# ========= GUILD PARTITIONS =========
+# All persistence goes through each guild's `gs.dal`, which runs the blocking
+# backend calls on one shared, bounded thread pool so the gateway heartbeat
+# never waits on disk.
+io_executor = make_io_executor(IO_POOL_SIZE)
+
+DM_KEY = "dm"
+
+def guild_key(guild_id):
+    if guild_id is None:
+        return DM_KEY
+    return None if guild_id == HOME_GUILD_ID else guild_id
+
+def guild_dir(key):
+    return "." if key is None else os.path.join(DATA_DIR, "guilds", str(key))
+
+def legacy_data_files():
+    """Top-level data files from before per-guild partitions; they belong to HOME_GUILD_ID."""
+    names = (SCORES_FILE, TEAMS_FILE, PHASES_FILE, SQLITE_FILE, COOLDOWN_FILE, ADMINS_FILE, ROLL_HISTORY_FILE, ARCHIVE_DIR)
+    return [n for n in names if os.path.exists(os.path.join(guild_dir(None), n))]
+
+def open_guild(key):
+    """Blocking: build the GuildState for a partition (runs on the I/O executor)."""
+    d = guild_dir(key)
+    os.makedirs(d, exist_ok=True)
+    path = lambda name: os.path.join(d, name)
+    store = open_storage(STORAGE_BACKEND, path(SCORES_FILE), path(TEAMS_FILE), path(PHASES_FILE), path(SQLITE_FILE),
+                         write_behind=WRITE_BEHIND_SECONDS > 0, archive=WeekArchive(path(ARCHIVE_DIR)))
+    # Catch up on rollovers missed while this guild wasn't loaded.
+    store.archive_weeks(archive_cutoff(current_week()[0]))
+    # Rankings are built here, off the event loop; commands then only update them.
+    boards = Leaderboards(SEASON_START)
+    boards.load_all(store.all_scores())
+    gs = GuildState(
+        key, d,
+        dal=DataAccess(store, io_executor),
+        boards=boards,
+        schedule=ScheduleCache(lambda: week_info(current_uae_now())),
+        cooldowns=CooldownStore({b: cd.total_seconds() for b, cd in COOLDOWNS.items()}, max_entries=COOLDOWN_MAX_ENTRIES),
+        history=RollHistory(ROLL_HISTORY_CAPACITY, ROLL_HISTORY_MAX_USERS),
+        cooldown_file=path(COOLDOWN_FILE),
+        admins_file=path(ADMINS_FILE),
+        history_file=path(ROLL_HISTORY_FILE),
+        rollover_file=path(ROLLOVER_FILE),
+    )
+    gs.load()
+    # ...and on the team reset, if the guild wasn't loaded at the last Mon/Thu 19:00.
+    week_start, slot = last_rollover()
+    if gs.last_rollover != (week_start, slot):
+        phases = store.load_phases()
+        gs.schedule.set_phases(phases)
+        cleared = store.clear_teams(active_phase_keys(phases, week_start, slot))
+        gs.save_rollover(week_start, slot)
+        print(f"[rollover] guild {gs.guild_id}: caught up on {slot} of {week_start}; cleared {cleared} team(s)")
+    return gs
+
+guilds = GuildRegistry(open_guild, io_executor)
+
+@tasks.loop(seconds=max(WRITE_BEHIND_SECONDS, 0.5))
+async def flush_storage():
+    for gs in guilds.loaded():
+        try:
+            await gs.dal.flush()
+        except Exception as e:  # keep the loop alive; the dirty files are retried next tick
+            print(f"[flush] guild {gs.guild_id}: {e!r}")
+
+def archive_cutoff(week_start: str):
+    """Weeks before this are moved to the archive."""
+    return (datetime.strptime(week_start, "%Y-%m-%d").date() - timedelta(weeks=ARCHIVE_KEEP_WEEKS)).isoformat()
+
+async def guild_state(ctx):
+    return await guilds.get(guild_key(ctx.guild.id if ctx.guild else None))
+
+def is_admin(ctx, gs):
+    return ctx.author.id in ADMINS or ctx.author.id in gs.admins
+
+async def load_phases_map(gs):
+    # Served from the guild's schedule cache; only re-read after a write invalidates it.
+    if gs.schedule.phases is None:
+        gs.schedule.set_phases(await gs.dal.load_phases())
+    return gs.schedule.phases
+
+async def set_week_phases(gs, week_start: str, phase1: str, phase2: str):
+    await gs.dal.set_week_phases(week_start, phase1, phase2)
+    gs.schedule.invalidate_phases()
+
+# ========= LEADERBOARDS =========
+# gs.boards is built from storage when the guild is opened (open_guild).
+def week_ranking(gs, week_start: str):
+    return gs.boards.week(week_start)
+
+async def save_phase_score(gs, user_id: int, username: str, week_start: str, slot: str, value: int):
+    # Update the ranking while still holding the scores lock so it matches storage order.
+    async with gs.dal.locked("scores") as tx:
+        row = await tx.save_phase_score(user_id, username, week_start, slot, value)
+        gs.boards.update(row)
+    return row
 
 # ========= UTIL: TIME WINDOWS =========
 def current_uae_now():
@@ -91,125 +233,157 @@ def week_info(now_uae: datetime):
     week_start_str = monday.isoformat()
     return week_start_str, active, phase1_start, phase1_end, phase2_end
 
+# week_info() for "now", recomputed only when the next Mon/Thu/Sun 19:00 boundary passes
+schedule = ScheduleCache(lambda: week_info(current_uae_now()))
+
+def current_week():
+    return schedule.current()
+
+# ========= WEEK ROLLOVER =========
+def last_rollover():
+    """(week_start, slot) of the latest Mon/Thu 19:00 boundary; in the Sun-Mon gap that's phase 2."""
+    week_start, active, *_ = current_week()
+    return week_start, active or "phase2"
+
+def active_phase_keys(phases_map, week_start: str, slot: str):
+    """clear_teams() keep set: the lowercase name of the phase in `slot` that week, if set."""
+    name = phases_map.get(week_start, {}).get(slot)
+    return {name.lower()} if name else set()
+
+async def rollover_guild(gs, week_start: str, active: str):
+    """Archive closed weeks, keep only the active phase's teams, and warm this week's caches."""
+    archived = await gs.dal.archive_weeks(archive_cutoff(week_start))
+    mp = await load_phases_map(gs)
+    cleared = await gs.dal.clear_teams(active_phase_keys(mp, week_start, active))
+    await gs.dal.run_blocking(gs.save_rollover, week_start, active)
+    gs.boards.week(week_start)
+    return archived, cleared
+
+# Runs daily just after 19:00 UAE; only Mon (new week, phase 1) and Thu (phase 2) do anything.
+@tasks.loop(time=time(19, 0, 5, tzinfo=UAETZ))
+async def week_rollover():
+    week_start, active, *_ = current_week()
+    if current_uae_now().weekday() not in (0, 3) or active is None:
+        return
+    try:
+        await asyncio.get_running_loop().run_in_executor(io_executor, unit_catalog.reload)
+    except Exception as e:  # roll over with the last good catalog rather than stopping the task
+        print(f"[rollover] reload of {UNITS_FILE} failed: {e!r}")
+    for gs in guilds.loaded():
+        try:
+            archived, cleared = await rollover_guild(gs, week_start, active)
+            print(f"[rollover] guild {gs.guild_id}: {active} of {week_start}; archived {archived or 'nothing'}, cleared {cleared} team(s)")
+        except Exception as e:
+            print(f"[rollover] guild {gs.guild_id}: {e!r}")
+
 # ========= UNITS LOADING =========
-def load_units_index():
-    """
-    Build an index: { phase_name_lower: {"Lead": [...], "Side": [...]} }
-    Role 'Side' contains only Side rows; we'll add Leads when choosing sides.
-    """
-    index = {}
-    with open(UNITS_FILE, newline="", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        # If the first row looks like headers, ignore it; otherwise treat it as data
-        def looks_like_header(row):
-            joined = ",".join([c.lower() for c in row])
-            return "phase" in joined and "role" in joined and "unit" in joined
-        if header and not looks_like_header(header):
-            # header was actually data
-            f.seek(0)
-            reader = csv.reader(f)
-
-        for row in reader:
-            if len(row) < 5:
-                continue
-            phase, affiliation, rng, role, unit = [c.strip() for c in row[:5]]
-            if not phase or not role or not unit:
-                continue
-            ph_key = phase.lower()
-            if ph_key not in index:
-                index[ph_key] = {"Lead": [], "Side": []}
-            if role.lower() == "lead":
-                index[ph_key]["Lead"].append(unit)
-            elif role.lower() == "side":
-                index[ph_key]["Side"].append(unit)
-    return index
-
-# ========= TEAM PERSISTENCE =========
-def load_current_team(user_id: int, phase_name: str):
-    ensure_teams_file()
-    with open(TEAMS_FILE, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if row["user_id"] == str(user_id) and row["phase"].lower() == phase_name.lower():
-                return {"lead": row["lead"] or None, "side1": row["side1"] or None, "side2": row["side2"] or None}
-    return {"lead": None, "side1": None, "side2": None}
-
-def save_current_team(user_id: int, username: str, phase_name: str, lead, side1, side2):
-    ensure_teams_file()
-    rows = []
-    found = False
-    with open(TEAMS_FILE, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if row["user_id"] == str(user_id) and row["phase"].lower() == phase_name.lower():
-                row["username"] = username
-                row["lead"] = lead or ""
-                row["side1"] = side1 or ""
-                row["side2"] = side2 or ""
-                row["updated_at"] = datetime.utcnow().isoformat()
-                found = True
-            rows.append(row)
-    if not found:
-        rows.append({
-            "user_id": str(user_id),
-            "username": username,
-            "phase": phase_name,
-            "lead": lead or "",
-            "side1": side1 or "",
-            "side2": side2 or "",
-            "updated_at": datetime.utcnow().isoformat()
-        })
-    with open(TEAMS_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["user_id","username","phase","lead","side1","side2","updated_at"])
-        writer.writeheader()
-        writer.writerows(rows)
+unit_catalog = UnitCatalog(UNITS_FILE)
+
+@tasks.loop(seconds=UNITS_WATCH_SECONDS)
+async def watch_units():
+    # Lookups and autocomplete only read the cached catalog, so edits are picked up here.
+    try:
+        await asyncio.get_running_loop().run_in_executor(io_executor, unit_catalog.reload)
+    except Exception as e:  # e.g. a half-saved edit; keep serving the last good catalog
+        print(f"[units] reload of {UNITS_FILE} failed: {e!r}")
+
+async def phase_autocomplete(interaction: discord.Interaction, current: str):
+    return [app_commands.Choice(name=name, value=name) for name in unit_catalog.index.complete(current, 25)]
+
+def invalid_phase_message(phase_name: str):
+    close = unit_catalog.index.complete(phase_name, 3)
+    if not close:
+        return "❌ Invalid phase name."
+    return "❌ Invalid phase name. Did you mean: " + ", ".join(f"`{n}`" for n in close) + "?"
 
 # ========= COOLDOWNS =========
-last_used = {
-    "team": {},
-    "lead": {},
-    "side1": {},
-    "side2": {},
-}
-def check_cooldown(user_id: int, bucket: str):
-    now = datetime.utcnow()
-    prev = last_used[bucket].get(user_id)
-    if prev:
-        elapsed = now - prev
-        if elapsed < COOLDOWN:
-            remain = COOLDOWN - elapsed
-            return math.ceil(remain.total_seconds()/60)
-    last_used[bucket][user_id] = now
-    return 0
+def check_cooldown(gs, user_id: int, bucket: str):
+    return gs.cooldowns.check(user_id, bucket)
+
+@tasks.loop(seconds=COOLDOWN_SNAPSHOT_SECONDS)
+async def snapshot_guilds():
+    for gs in guilds.loaded():
+        snap = gs.take_snapshot()  # on the loop: check()/push() mutate these here
+        try:
+            await gs.dal.run_blocking(gs.write_snapshot, snap)
+        except Exception as e:  # keep the loop alive; retried next tick
+            if snap[1] is not None:
+                gs.history.dirty = True
+            print(f"[snapshot] guild {gs.guild_id}: {e!r}")
 
 # ========= HELPERS =========
+outbox = Outbox(OUTBOX_RATE, OUTBOX_PER, OUTBOX_COALESCE_AT)
+
+async def reply(ctx, content=None, *, embed=None, summary=None, **kwargs):
+    """
+    Send through the per-channel outbox; `summary` is the one-liner used when
+    merging, kwargs (file/files/view) go to send(). Returns a future for the Message.
+    """
+    return await outbox.send(ctx, content, embed=embed, summary=summary, **kwargs)
+
 def normalize_phase_name(s: str) -> str:
     return re.sub(r"\s+", " ", s.strip())
 
-def pick_random(pool, exclude=None):
-    exclude = set([e for e in (exclude or []) if e])
-    candidates = [x for x in pool if x not in exclude]
-    if not candidates:
-        return None
-    return random.choice(candidates)
-
-def get_active_phase_name_for_now():
-    now = current_uae_now()
-    week_start, active, *_ = week_info(now)
-    phases_map = load_phases_map()
-    entry = phases_map.get(week_start)
-    if not entry:
-        return week_start, active, None
-    if active == "phase1":
-        return week_start, active, entry.get("phase1")
-    elif active == "phase2":
-        return week_start, active, entry.get("phase2")
-    else:
-        return week_start, active, None
+sampler = Sampler(ROLL_SEED)
+
+def pick_random(pool, exclude=None, avoid=()):
+    return sampler.pick(pool, exclude or (), avoid)
+
+def history_depth(phase_name: str):
+    return max(1, min(ROLL_HISTORY_DEPTHS.get(phase_name.lower(), ROLL_HISTORY_DEPTH), ROLL_HISTORY_CAPACITY))
+
+async def get_active_phase_name_for_now(gs):
+    await load_phases_map(gs)
+    return gs.schedule.active_phase_name()
 
 # ========= BOT EVENTS =========
+class GQBot(commands.AutoShardedBot):
+    keep_alive_runner = None
+
+    async def setup_hook(self):
+        await asyncio.get_running_loop().run_in_executor(io_executor, unit_catalog.reload)
+        snapshot_guilds.start()
+        watch_units.start()
+        week_rollover.start()
+        if WRITE_BEHIND_SECONDS > 0:
+            flush_storage.start()
+        if KEEP_ALIVE_MODE == "async":
+            self.keep_alive_runner = await start_async_keep_alive(self, KEEP_ALIVE_PORT)
+
+    async def close(self):
+        snapshot_guilds.cancel()
+        watch_units.cancel()
+        week_rollover.cancel()
+        flush_storage.cancel()
+        if self.keep_alive_runner is not None:
+            await self.keep_alive_runner.cleanup()
+        await outbox.close()
+        await super().close()
+        # Let in-flight I/O (including a cancelled flush) finish before the final flush.
+        io_executor.shutdown(wait=True)
+        guilds.close()
+
+bot = GQBot(command_prefix=COMMAND_PREFIX, intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS)
+
 @bot.event
 async def on_ready():
-    print(f"Bot connected as {bot.user}")
+    print(f"Bot connected as {bot.user} (shards {sorted(bot.shards)} of {bot.shard_count}, {len(bot.guilds)} guilds)")
+
+# ========= METRICS =========
+@bot.before_invoke
+async def _before_command(ctx):
+    ctx.started_at = perf_counter()
+    # Slash invocations must be answered within 3s, and a guild's first command opens its
+    # partition (files, archive catch-up, rankings). Defer first; replies become followups.
+    if ctx.interaction is not None and not ctx.interaction.response.is_done():
+        await ctx.defer()
+
+@bot.after_invoke
+async def _record_command(ctx):
+    # After-invoke hooks also run when the handler raised; ctx.command_failed tells us which.
+    started = getattr(ctx, "started_at", None)
+    if started is not None:
+        metrics.observe_command(ctx.command.qualified_name, perf_counter() - started, error=ctx.command_failed)
 
 @bot.command(name="setphases")
 async def setphases(ctx, *, args: str):
@@ -218,31 +392,29 @@ async def setphases(ctx, *, args: str):
       !setphases Phase One | Phase Two
     Quotes are optional; we split on the first '|'.
     """
-    if ctx.author.id not in ADMINS:
-        await ctx.send("❌ Admins only.")
+    gs = await guild_state(ctx)
+    if not is_admin(ctx, gs):
+        await reply(ctx, "❌ Admins only.")
         return
 
     parts = [normalize_phase_name(p) for p in args.split("|")]
     if len(parts) < 2:
-        await ctx.send("❌ Please provide two phases separated by `|`.\nExample: `!setphases Soul Reaper Melee | Arrancar Ranged`")
+        await reply(ctx, "❌ Please provide two phases separated by `|`.\nExample: `!setphases Soul Reaper Melee | Arrancar Ranged`")
         return
 
     phase1, phase2 = parts[0], parts[1]
-    now = current_uae_now()
-    week_start, active, *_ = week_info(now)
-    mp = load_phases_map()
-    mp[week_start] = {"phase1": phase1, "phase2": phase2}
-    save_phases_map(mp)
+    week_start, active, *_ = current_week()
+    await set_week_phases(gs, week_start, phase1, phase2)
 
-    await ctx.send(f"✅ Phases set for week starting **{week_start}**:\n**Phase 1:** {phase1}\n**Phase 2:** {phase2}\nActive window: **{active or 'None (gap)'}**")
+    await reply(ctx, f"✅ Phases set for week starting **{week_start}**:\n**Phase 1:** {phase1}\n**Phase 2:** {phase2}\nActive window: **{active or 'None (gap)'}**")
 
 
 # ========= INFO: SHOW PHASES/CURRENT =========
-@bot.command(name="phases")
+@bot.hybrid_command(name="phases", description="Show this week's phases and which window is active (UAE).")
 async def phases_cmd(ctx):
-    now = current_uae_now()
-    week_start, active, p1_start, p1_end, p2_end = week_info(now)
-    mp = load_phases_map()
+    gs = await guild_state(ctx)
+    week_start, active, p1_start, p1_end, p2_end = current_week()
+    mp = await load_phases_map(gs)
     entry = mp.get(week_start, {})
     p1 = entry.get("phase1", "— not set —")
     p2 = entry.get("phase2", "— not set —")
@@ -254,38 +426,9 @@ async def phases_cmd(ctx):
         f"**Phase 2:** {p2}  _(Thu 19:00 → Sun 19:00)_\n"
         f"🔔 **Active now:** {active or 'None (Sun 19:00 → Mon 19:00 gap)'}"
     )
-    await ctx.send(msg)
+    await reply(ctx, msg)
 
 # ========= SCORE SUBMISSION =========
-def get_or_create_score_row(user_id: int, username: str, week_start: str):
-    ensure_scores_file()
-    rows = []
-    found = None
-    with open(SCORES_FILE, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            rows.append(row)
-            if row["user_id"] == str(user_id) and row["week_start"] == week_start:
-                found = row
-
-    if not found:
-        found = {
-            "user_id": str(user_id),
-            "username": username,
-            "week_start": week_start,
-            "phase1": "0",
-            "phase2": "0",
-            "total": "0",
-        }
-        rows.append(found)
-
-    return rows, found
-
-def write_scores(rows):
-    with open(SCORES_FILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["user_id","username","week_start","phase1","phase2","total"])
-        writer.writeheader()
-        writer.writerows(rows)
-
 def parse_score_arg(arg: str):
     # accept digits only; people sometimes paste with commas; strip them
     cleaned = re.sub(r"[^\d]", "", arg or "")
@@ -296,233 +439,685 @@ def parse_score_arg(arg: str):
     except Exception:
         return None
 
-@bot.command(name="submitp1")
+@bot.hybrid_command(name="submitp1", description="Save your Phase 1 score for the current week.")
+@app_commands.describe(score="Your score (commas are fine)")
 async def submitp1(ctx, score: str):
+    gs = await guild_state(ctx)
     score_val = parse_score_arg(score)
     if score_val is None:
-        await ctx.send("❌ Please provide a numeric score. Example: `!submitp1 524698600`")
-        return
-    now = current_uae_now()
-    week_start, *_ = week_info(now)
-    rows, row = get_or_create_score_row(ctx.author.id, str(ctx.author), week_start)
-    row["username"] = str(ctx.author)
-    row["phase1"] = str(score_val)
-    total = int(row.get("phase1", "0") or 0) + int(row.get("phase2", "0") or 0)
-    row["total"] = str(total)
-    write_scores(rows)
-    await ctx.send(f"✅ Saved **Phase 1** score `{score_val}` for **{ctx.author.display_name}** (week {week_start}). Total now `{total}`.")
-
-@bot.command(name="submitp2")
+        await reply(ctx, "❌ Please provide a numeric score. Example: `!submitp1 524698600`")
+        return
+    week_start, *_ = current_week()
+    row = await save_phase_score(gs, ctx.author.id, str(ctx.author), week_start, "phase1", score_val)
+    total = row.total
+    await reply(ctx, f"✅ Saved **Phase 1** score `{score_val}` for **{ctx.author.display_name}** (week {week_start}). Total now `{total}`.",
+                summary=f"✅ Phase 1 `{score_val}` — total `{total}`")
+
+@bot.hybrid_command(name="submitp2", description="Save your Phase 2 score for the current week.")
+@app_commands.describe(score="Your score (commas are fine)")
 async def submitp2(ctx, score: str):
+    gs = await guild_state(ctx)
     score_val = parse_score_arg(score)
     if score_val is None:
-        await ctx.send("❌ Please provide a numeric score. Example: `!submitp2 372798271`")
-        return
-    now = current_uae_now()
-    week_start, *_ = week_info(now)
-    rows, row = get_or_create_score_row(ctx.author.id, str(ctx.author), week_start)
-    row["username"] = str(ctx.author)
-    row["phase2"] = str(score_val)
-    total = int(row.get("phase1", "0") or 0) + int(row.get("phase2", "0") or 0)
-    row["total"] = str(total)
-    write_scores(rows)
-    await ctx.send(f"✅ Saved **Phase 2** score `{score_val}` for **{ctx.author.display_name}** (week {week_start}). Total now `{total}`.")
+        await reply(ctx, "❌ Please provide a numeric score. Example: `!submitp2 372798271`")
+        return
+    week_start, *_ = current_week()
+    row = await save_phase_score(gs, ctx.author.id, str(ctx.author), week_start, "phase2", score_val)
+    total = row.total
+    await reply(ctx, f"✅ Saved **Phase 2** score `{score_val}` for **{ctx.author.display_name}** (week {week_start}). Total now `{total}`.",
+                summary=f"✅ Phase 2 `{score_val}` — total `{total}`")
 
 @bot.command(name="myscore")
-async def myscore(ctx):
-    ensure_scores_file()
-    now = current_uae_now()
-    week_start, *_ = week_info(now)
-    with open(SCORES_FILE, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if row["user_id"] == str(ctx.author.id) and row["week_start"] == week_start:
-                p1 = int(row.get("phase1","0") or 0)
-                p2 = int(row.get("phase2","0") or 0)
-                tot = int(row.get("total","0") or 0)
-                await ctx.send(f"🎯 **{ctx.author.display_name}** – Week {week_start}\nPhase 1: `{p1}`\nPhase 2: `{p2}`\n**Total:** `{tot}`")
-                return
-    await ctx.send(f"ℹ️ No scores yet for **{ctx.author.display_name}** (week {week_start}). Use `!submitp1` / `!submitp2`.")
+async def myscore(ctx, scope: str = None):
+    gs = await guild_state(ctx)
+    week_start, *_ = current_week()
+    ranking = week_ranking(gs, week_start)
+    if scope and scope.lower() == "history":
+        history = gs.boards.history(ctx.author.id)
+        if not history:
+            await reply(ctx, f"ℹ️ No score history for **{ctx.author.display_name}** yet.")
+            return
+        lines = [f"📜 **{ctx.author.display_name}** – last {min(len(history), 12)} of {len(history)} week(s)"]
+        for w, total in history[:12]:
+            lines.append(f"• {w}: `{total}`")
+        season = gs.boards.season.row(ctx.author.id)
+        if season:
+            lines.append(f"🏆 **Season total:** `{season.total}` over {season.weeks} week(s) — rank #{gs.boards.season.rank(ctx.author.id)} of {len(gs.boards.season)}")
+        await reply(ctx, "\n".join(lines))
+        return
+    row = ranking.row(ctx.author.id)
+    if row:
+        rank = ranking.rank(ctx.author.id)
+        await reply(ctx, f"🎯 **{ctx.author.display_name}** – Week {week_start}\nPhase 1: `{row.phase1}`\nPhase 2: `{row.phase2}`\n**Total:** `{row.total}`\n🏅 **Rank:** #{rank} of {len(ranking)}")
+        return
+    await reply(ctx, f"ℹ️ No scores yet for **{ctx.author.display_name}** (week {week_start}). Use `!submitp1` / `!submitp2`.")
 
 @bot.command(name="leaderboard")
-async def leaderboard(ctx):
-    ensure_scores_file()
-    now = current_uae_now()
-    week_start, *_ = week_info(now)
-    rows = []
-    with open(SCORES_FILE, newline="", encoding="utf-8") as f:
-        for row in csv.DictReader(f):
-            if row["week_start"] == week_start:
-                rows.append({
-                    "username": row["username"],
-                    "p1": int(row.get("phase1","0") or 0),
-                    "p2": int(row.get("phase2","0") or 0),
-                    "total": int(row.get("total","0") or 0),
-                })
-    if not rows:
-        await ctx.send(f"📊 No entries yet for week {week_start}.")
-        return
-    rows.sort(key=lambda r: r["total"], reverse=True)
+async def leaderboard(ctx, *, scope: str = None):
+    """
+    Usage:
+      !leaderboard                 current week
+      !leaderboard season          season running totals
+      !leaderboard last 4 weeks    summed over the last N weeks
+    """
+    gs = await guild_state(ctx)
+    week_start, *_ = current_week()
+    ranking = week_ranking(gs, week_start)
+    scope = (scope or "").strip().lower()
+    if scope == "season":
+        if not len(gs.boards.season):
+            await reply(ctx, "📊 No season entries yet.")
+            return
+        since = f" since {SEASON_START}" if SEASON_START else ""
+        lines = [f"**Season Leaderboard{since}**"]
+        for i, r in enumerate(gs.boards.season.top(10), start=1):
+            lines.append(f"{i}. {r.username} — Total `{r.total}` ({r.weeks} week(s))")
+        await reply(ctx, "\n".join(lines))
+        return
+    if scope:
+        m = re.fullmatch(r"last\s+(\d+)(\s+weeks?)?", scope)
+        if not m or int(m.group(1)) < 1:
+            await reply(ctx, "❌ Usage: `!leaderboard`, `!leaderboard season` or `!leaderboard last 4 weeks`.")
+            return
+        n = min(int(m.group(1)), 520)
+        weeks, top = gs.boards.last_weeks(week_start, n)
+        if not top:
+            await reply(ctx, "📊 No entries in that range.")
+            return
+        lines = [f"**Leaderboard – last {n} week(s) ({len(weeks)} with scores, {weeks[0]} → {weeks[-1]})**"]
+        for i, r in enumerate(top, start=1):
+            lines.append(f"{i}. {r.username} — Total `{r.total}` ({r.weeks} week(s))")
+        await reply(ctx, "\n".join(lines))
+        return
+    if not len(ranking):
+        await reply(ctx, f"📊 No entries yet for week {week_start}.")
+        return
     lines = [f"**Week {week_start} Leaderboard**"]
-    for i, r in enumerate(rows[:10], start=1):
-        lines.append(f"{i}. {r['username']} — Total `{r['total']}` (P1 `{r['p1']}`, P2 `{r['p2']}`)")
-    await ctx.send("\n".join(lines))
+    for i, r in enumerate(ranking.top(10), start=1):
+        lines.append(f"{i}. {r.username} — Total `{r.total}` (P1 `{r.phase1}`, P2 `{r.phase2}`)")
+    await reply(ctx, "\n".join(lines))
+
+# ========= BULK IMPORT / EXPORT =========
+async def download_attachment(attachment, dal):
+    """
+    Stream an attachment into a temp file IMPORT_CHUNK_BYTES at a time (small
+    files stay in memory, larger ones spool to disk) and return it rewound.
+    """
+    import aiohttp
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(attachment.url) as resp:
+                resp.raise_for_status()
+                size = 0
+                async for chunk in resp.content.iter_chunked(IMPORT_CHUNK_BYTES):
+                    size += len(chunk)
+                    if size > IMPORT_MAX_BYTES:
+                        raise ValueError("attachment too large")
+                    await dal.run_blocking(spool.write, chunk)
+        spool.seek(0)
+        return spool
+    except BaseException:
+        spool.close()
+        raise
+
+def parse_score_sheet(f):
+    """
+    Parse an uploaded scores CSV (columns: user_id, username, phase1, phase2;
+    username and either phase may be blank) row by row from binary file `f`.
+    Returns (entries, errors): entries are (user_id, username, p1, p2), None
+    for blank (keep the stored value). Several rows for one user are merged
+    field by field, later non-blank cells winning; errors are (line_no, message).
+    """
+    entries, errors = {}, []
+    reader = csv.reader(io.TextIOWrapper(f, encoding="utf-8-sig", newline=""))
+    header = [h.strip().lower() for h in next(reader, [])]
+    if "user_id" not in header:
+        return [], [(1, "header must include a `user_id` column (plus `phase1`/`phase2`, optional `username`)")]
+    col = {name: header.index(name) for name in ("user_id", "username", "phase1", "phase2") if name in header}
+    for line_no, cells in enumerate(reader, start=2):
+        if not any(c.strip() for c in cells):
+            continue
+        get = lambda name: cells[col[name]].strip() if name in col and col[name] < len(cells) else ""
+        uid = get("user_id")
+        if not uid.isdigit():
+            errors.append((line_no, f"invalid user_id {uid!r}"))
+            continue
+        scores = []
+        for slot in ("phase1", "phase2"):
+            raw = get(slot)
+            val = parse_score_arg(raw) if raw else None
+            if raw and val is None:
+                errors.append((line_no, f"invalid {slot} {raw!r}"))
+                break
+            scores.append(val)
+        else:
+            if scores == [None, None]:
+                errors.append((line_no, "no phase1/phase2 score"))
+                continue
+            new = (int(uid), get("username") or None, scores[0], scores[1])
+            old = entries.get(new[0])
+            entries[new[0]] = new if old is None else tuple(o if n is None else n for o, n in zip(old, new))
+    return list(entries.values()), errors
+
+@bot.command(name="importscores")
+async def importscores(ctx, week: str = None):
+    """
+    Usage (attach a .csv):
+      !importscores [YYYY-MM-DD]
+    Applies every valid row to the week (default: current) in one write.
+    """
+    gs = await guild_state(ctx)
+    if not is_admin(ctx, gs):
+        await reply(ctx, "❌ Admins only.")
+        return
+    if not ctx.message or not ctx.message.attachments:
+        await reply(ctx, "❌ Attach a CSV with columns `user_id,username,phase1,phase2`.\nExample: `!importscores 2025-07-07` + attachment")
+        return
+    week_start = week or current_week()[0]
+    try:
+        if datetime.strptime(week_start, "%Y-%m-%d").weekday() != 0:
+            raise ValueError
+    except ValueError:
+        await reply(ctx, "❌ Week must be a Monday date like `2025-07-07`.")
+        return
+
+    attachment = ctx.message.attachments[0]
+    if attachment.size > IMPORT_MAX_BYTES:
+        await reply(ctx, f"❌ Attachment is too large (max {IMPORT_MAX_BYTES // (1024 * 1024)} MiB).")
+        return
+    try:
+        upload = await download_attachment(attachment, gs.dal)
+    except Exception:
+        await reply(ctx, "❌ Couldn't download the attachment, try again.")
+        return
+    with upload:
+        entries, errors = await gs.dal.run_blocking(parse_score_sheet, upload)
+    if ctx.guild:
+        entries = [(uid, name or (str(m) if (m := ctx.guild.get_member(uid)) else None), p1, p2)
+                   for uid, name, p1, p2 in entries]
+
+    rows = []
+    if entries:
+        async with gs.dal.locked("scores") as tx:
+            rows = await tx.bulk_upsert_scores(week_start, entries)
+            for row in rows:
+                gs.boards.update(row)
+
+    msg = f"📥 Imported **{len(rows)}** score row(s) for week **{week_start}**."
+    if not errors:
+        await reply(ctx, msg)
+        return
+    report = "\n".join(f"line {n}: {err}" for n, err in errors)
+    msg += f"\n⚠️ {len(errors)} row(s) skipped — see attached report."
+    await reply(ctx, msg, file=discord.File(io.BytesIO(report.encode("utf-8")), filename=f"import_errors_{week_start}.txt"))
+
+@bot.command(name="exportscores")
+async def exportscores(ctx, scope: str = None):
+    """
+    Usage:
+      !exportscores                current week
+      !exportscores 2025-07-07     one week
+      !exportscores season         every week since SEASON_START
+    """
+    gs = await guild_state(ctx)
+    if not is_admin(ctx, gs):
+        await reply(ctx, "❌ Admins only.")
+        return
+    week_start, since, label = current_week()[0], None, None
+    if scope and scope.lower() == "season":
+        week_start, since, label = None, SEASON_START or None, "season"
+    elif scope:
+        if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", scope):
+            await reply(ctx, "❌ Usage: `!exportscores`, `!exportscores 2025-07-07` or `!exportscores season`.")
+            return
+        week_start = scope
+    label = label or week_start
+
+    # Rows stream from storage straight into a temp file; history is never held in memory.
+    fd, path = tempfile.mkstemp(prefix="gq-export-", suffix=".csv")
+    os.close(fd)
+    try:
+        n = await gs.dal.export_scores(path, week_start, since)
+        sent = await reply(ctx, f"📤 {n} score row(s) ({label}).", file=discord.File(path, filename=f"scores_{label}.csv"))
+        await sent  # the temp file has to outlive the queued upload
+    finally:
+        os.remove(path)
 
 # ========= REROLL COMMANDS =========
-_last_rolls = {}  # {user_id: {"lead": x, "side1": y, "side2": z}}
 
 def choose_sets_for_phase(phase_name: str):
-    idx = load_units_index()
-    rec = idx.get(phase_name.lower())
+    rec = unit_catalog.get(phase_name)
     if not rec:
-        return None, None
-    leads = rec.get("Lead", [])
-    sides = rec.get("Side", [])
-    return leads, sides
+        return None, None, None
+    return rec.leads, rec.sides, rec.side_pool
 
-async def _resolve_phase_for_command(ctx, provided_phase: str | None):
+async def _resolve_phase_for_command(ctx, gs, provided_phase: str | None):
     if provided_phase and provided_phase.strip():
-        return normalize_phase_name(provided_phase)
-    week_start, active, active_name = get_active_phase_name_for_now()
+        return unit_catalog.resolve(provided_phase) or normalize_phase_name(provided_phase)
+    week_start, active, active_name = await get_active_phase_name_for_now(gs)
     if active_name:
         return active_name
-    await ctx.send("ℹ️ No active phase window right now (Sun 19:00 → Mon 19:00 UAE). Please specify a phase name, e.g. `!rerollteam Soul Reaper Melee`.")
+    await reply(ctx, "ℹ️ No active phase window right now (Sun 19:00 → Mon 19:00 UAE). Please specify a phase name, e.g. `!rerollteam Soul Reaper Melee`.")
     return None
 
-@bot.command(name="rerollteam")
+@bot.hybrid_command(name="rerollteam", description="Roll a Lead + Side 1 + Side 2 (defaults to the active phase).")
+@app_commands.describe(phase="Phase name (start typing to search)")
+@app_commands.autocomplete(phase=phase_autocomplete)
 async def rerollteam(ctx, *, phase: str = None):
+    gs = await guild_state(ctx)
     # cooldown
-    left = check_cooldown(ctx.author.id, "team")
+    left = check_cooldown(gs, ctx.author.id, "team")
     if left > 0:
-        await ctx.send(f"⏳ You can use this command again in {left} minute(s).")
+        await reply(ctx, f"⏳ You can use this command again in {left} minute(s).")
         return
 
-    phase_name = await _resolve_phase_for_command(ctx, phase)
+    phase_name = await _resolve_phase_for_command(ctx, gs, phase)
     if not phase_name:
         return
 
-    leads, sides = choose_sets_for_phase(phase_name)
+    leads, sides, side_pool = choose_sets_for_phase(phase_name)
     if leads is None:
-        await ctx.send("❌ Invalid phase name.")
+        await reply(ctx, invalid_phase_message(phase_name))
         return
 
-    # sides can include leads (pool for sides = Side + Lead)
-    side_pool = list(sides) + list(leads)
-    current = load_current_team(ctx.author.id, phase_name)
-    prev = _last_rolls.get(ctx.author.id, {})
-
-    lead = pick_random(leads, exclude=[prev.get("lead"), current.get("side1"), current.get("side2")])
-    if not lead:
-        await ctx.send("⚠️ Not enough unique leads.")
-        return
-
-    filtered1 = [u for u in side_pool if u != lead]
-    side1 = pick_random(filtered1, exclude=[prev.get("side1"), current.get("lead"), current.get("side2")])
-    if not side1:
-        await ctx.send("⚠️ Not enough side options for Side 1.")
-        return
-
-    filtered2 = [u for u in filtered1 if u != side1]
-    side2 = pick_random(filtered2, exclude=[prev.get("side2"), current.get("lead"), current.get("side1")])
-    if not side2:
-        await ctx.send("⚠️ Not enough side options for Side 2.")
-        return
-
-    _last_rolls[ctx.author.id] = {"lead": lead, "side1": side1, "side2": side2}
-    save_current_team(ctx.author.id, str(ctx.author), phase_name, lead, side1, side2)
-
+    # side_pool already includes leads (pool for sides = Side + Lead)
+    async with gs.dal.locked("teams") as tx:
+        current = await tx.load_team(ctx.author.id, phase_name)
+        depth = history_depth(phase_name)
+        recent = {slot: gs.history.recent(ctx.author.id, slot, depth) for slot in ("lead", "side1", "side2")}
+
+        lead, side1, side2, failed = sampler.draw_team(leads, side_pool, recent, current)
+        if failed == "lead":
+            await reply(ctx, "⚠️ Not enough unique leads.")
+            return
+        if failed == "side1":
+            await reply(ctx, "⚠️ Not enough side options for Side 1.")
+            return
+        if failed == "side2":
+            await reply(ctx, "⚠️ Not enough side options for Side 2.")
+            return
+
+        gs.history.record(ctx.author.id, lead=lead, side1=side1, side2=side2)
+        await tx.save_team(ctx.author.id, str(ctx.author), phase_name, lead, side1, side2)
+
+    lead, side1, side2 = (unit_ids.name(u) for u in (lead, side1, side2))
     embed = discord.Embed(title=f"🎲 Your GQ Team – {phase_name}", color=0x00ffcc)
     embed.add_field(name="🔹 Lead (SP)", value=lead, inline=False)
     embed.add_field(name="🔸 Side 1", value=side1, inline=True)
     embed.add_field(name="🔸 Side 2", value=side2, inline=True)
-    await ctx.send(embed=embed)
+    await reply(ctx, embed=embed, summary=f"**{phase_name}** — Lead `{lead}` · Sides `{side1}`, `{side2}`")
 
-@bot.command(name="rerolllead")
+@bot.hybrid_command(name="rerolllead", description="Reroll your Lead only (defaults to the active phase).")
+@app_commands.describe(phase="Phase name (start typing to search)")
+@app_commands.autocomplete(phase=phase_autocomplete)
 async def rerolllead(ctx, *, phase: str = None):
-    left = check_cooldown(ctx.author.id, "lead")
+    gs = await guild_state(ctx)
+    left = check_cooldown(gs, ctx.author.id, "lead")
     if left > 0:
-        await ctx.send(f"⏳ You can reroll your lead again in {left} minute(s).")
+        await reply(ctx, f"⏳ You can reroll your lead again in {left} minute(s).")
         return
 
-    phase_name = await _resolve_phase_for_command(ctx, phase)
+    phase_name = await _resolve_phase_for_command(ctx, gs, phase)
     if not phase_name:
         return
 
-    leads, sides = choose_sets_for_phase(phase_name)
+    leads, sides, side_pool = choose_sets_for_phase(phase_name)
     if leads is None:
-        await ctx.send("❌ Invalid phase name.")
+        await reply(ctx, invalid_phase_message(phase_name))
         return
 
-    current = load_current_team(ctx.author.id, phase_name)
-    prev = _last_rolls.get(ctx.author.id, {})
+    async with gs.dal.locked("teams") as tx:
+        current = await tx.load_team(ctx.author.id, phase_name)
+        recent = gs.history.recent(ctx.author.id, "lead", history_depth(phase_name))
 
-    lead = pick_random(leads, exclude=[prev.get("lead"), current.get("side1"), current.get("side2")])
-    if not lead:
-        await ctx.send("⚠️ No unique lead found.")
-        return
+        lead = pick_random(leads, exclude=[*recent[:1], current.side1, current.side2], avoid=recent[1:])
+        if not lead:
+            await reply(ctx, "⚠️ No unique lead found.")
+            return
 
-    save_current_team(ctx.author.id, str(ctx.author), phase_name, lead, current.get("side1"), current.get("side2"))
-    _last_rolls.setdefault(ctx.author.id, {})["lead"] = lead
-    await ctx.send(f"🎯 **Lead ({phase_name})**: `{lead}`")
+        await tx.save_team(ctx.author.id, str(ctx.author), phase_name, lead, current.side1, current.side2)
+    gs.history.push(ctx.author.id, "lead", lead)
+    lead = unit_ids.name(lead)
+    await reply(ctx, f"🎯 **Lead ({phase_name})**: `{lead}`", summary=f"🎯 Lead ({phase_name}): `{lead}`")
 
-@bot.command(name="rerollside1")
+@bot.hybrid_command(name="rerollside1", description="Reroll your Side 1 only (defaults to the active phase).")
+@app_commands.describe(phase="Phase name (start typing to search)")
+@app_commands.autocomplete(phase=phase_autocomplete)
 async def rerollside1(ctx, *, phase: str = None):
-    left = check_cooldown(ctx.author.id, "side1")
+    gs = await guild_state(ctx)
+    left = check_cooldown(gs, ctx.author.id, "side1")
     if left > 0:
-        await ctx.send(f"⏳ You can reroll Side 1 again in {left} minute(s).")
+        await reply(ctx, f"⏳ You can reroll Side 1 again in {left} minute(s).")
         return
 
-    phase_name = await _resolve_phase_for_command(ctx, phase)
+    phase_name = await _resolve_phase_for_command(ctx, gs, phase)
     if not phase_name:
         return
 
-    leads, sides = choose_sets_for_phase(phase_name)
+    leads, sides, side_pool = choose_sets_for_phase(phase_name)
     if leads is None:
-        await ctx.send("❌ Invalid phase name.")
+        await reply(ctx, invalid_phase_message(phase_name))
         return
 
-    pool = list(sides) + list(leads)
-    current = load_current_team(ctx.author.id, phase_name)
-    prev = _last_rolls.get(ctx.author.id, {})
+    async with gs.dal.locked("teams") as tx:
+        current = await tx.load_team(ctx.author.id, phase_name)
+        recent = gs.history.recent(ctx.author.id, "side1", history_depth(phase_name))
 
-    options = [u for u in pool if u != current.get("lead") and u != current.get("side2")]
-    side1 = pick_random(options, exclude=[prev.get("side1")])
-    if not side1:
-        await ctx.send("⚠️ No unique Side 1 found.")
-        return
+        side1 = pick_random(side_pool, exclude=[*recent[:1], current.lead, current.side2], avoid=recent[1:])
+        if not side1:
+            await reply(ctx, "⚠️ No unique Side 1 found.")
+            return
 
-    save_current_team(ctx.author.id, str(ctx.author), phase_name, current.get("lead"), side1, current.get("side2"))
-    _last_rolls.setdefault(ctx.author.id, {})["side1"] = side1
-    await ctx.send(f"🛡️ **Side 1 ({phase_name})**: `{side1}`")
+        await tx.save_team(ctx.author.id, str(ctx.author), phase_name, current.lead, side1, current.side2)
+    gs.history.push(ctx.author.id, "side1", side1)
+    side1 = unit_ids.name(side1)
+    await reply(ctx, f"🛡️ **Side 1 ({phase_name})**: `{side1}`", summary=f"🛡️ Side 1 ({phase_name}): `{side1}`")
 
-@bot.command(name="rerollside2")
+@bot.hybrid_command(name="rerollside2", description="Reroll your Side 2 only (defaults to the active phase).")
+@app_commands.describe(phase="Phase name (start typing to search)")
+@app_commands.autocomplete(phase=phase_autocomplete)
 async def rerollside2(ctx, *, phase: str = None):
-    left = check_cooldown(ctx.author.id, "side2")
+    gs = await guild_state(ctx)
+    left = check_cooldown(gs, ctx.author.id, "side2")
     if left > 0:
-        await ctx.send(f"⏳ You can reroll Side 2 again in {left} minute(s).")
+        await reply(ctx, f"⏳ You can reroll Side 2 again in {left} minute(s).")
         return
 
-    phase_name = await _resolve_phase_for_command(ctx, phase)
+    phase_name = await _resolve_phase_for_command(ctx, gs, phase)
     if not phase_name:
         return
 
-    leads, sides = choose_sets_for_phase(phase_name)
+    leads, sides, side_pool = choose_sets_for_phase(phase_name)
+    if leads is None:
+        await reply(ctx, invalid_phase_message(phase_name))
+        return
+
+    async with gs.dal.locked("teams") as tx:
+        current = await tx.load_team(ctx.author.id, phase_name)
+        recent = gs.history.recent(ctx.author.id, "side2", history_depth(phase_name))
+
+        side2 = pick_random(side_pool, exclude=[*recent[:1], current.lead, current.side1], avoid=recent[1:])
+        if not side2:
+            await reply(ctx, "⚠️ No unique Side 2 found.")
+            return
+
+        await tx.save_team(ctx.author.id, str(ctx.author), phase_name, current.lead, current.side1, side2)
+    gs.history.push(ctx.author.id, "side2", side2)
+    side2 = unit_ids.name(side2)
+    await reply(ctx, f"🛡️ **Side 2 ({phase_name})**: `{side2}`", summary=f"🛡️ Side 2 ({phase_name}): `{side2}`")
+
+# ========= BATCH ROLL =========
+class PagedEmbed(discord.ui.View):
+    """Prev/next buttons over pre-built embed pages."""
+
+    def __init__(self, pages, timeout=ROLLTEAMS_PAGE_TIMEOUT):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.index = 0
+        self.message = None
+        self._sync()
+
+    def _sync(self):
+        self.prev_page.disabled = self.index == 0
+        self.next_page.disabled = self.index >= len(self.pages) - 1
+
+    async def _show(self, interaction, index):
+        self.index = max(0, min(index, len(self.pages) - 1))
+        self._sync()
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction, button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+def rollteams_pages(phase_name, rolled, failed):
+    """Summary embeds for !rollteams: `rolled` is [(member, lead, side1, side2)] by name, `failed` [(member, slot)]."""
+    lines = [f"**{m.display_name}** — `{lead}` · `{side1}`, `{side2}`" for m, lead, side1, side2 in rolled]
+    lines += [f"⚠️ **{m.display_name}** — not enough options for {slot}" for m, slot in failed]
+    chunks = [lines[i:i + ROLLTEAMS_PAGE_SIZE] for i in range(0, len(lines), ROLLTEAMS_PAGE_SIZE)] or [["(nobody)"]]
+    pages = []
+    for n, chunk in enumerate(chunks, start=1):
+        embed = discord.Embed(title=f"🎲 Teams – {phase_name}", description="\n".join(chunk)[:4096], color=0x00ffcc)
+        embed.set_footer(text=f"{len(rolled)} rolled, {len(failed)} failed · Lead · Side 1, Side 2 · page {n}/{len(chunks)}")
+        pages.append(embed)
+    return pages
+
+@bot.command(name="rollteams")
+async def rollteams(ctx, targets: commands.Greedy[discord.Member | discord.Role], *, phase: str = None):
+    """
+    Usage:
+      !rollteams @Role [phase]
+      !rollteams @member @member ... [phase]
+    Rolls a team for every member in one pass, with the !rerollteam rules.
+    """
+    gs = await guild_state(ctx)
+    if not is_admin(ctx, gs):
+        await reply(ctx, "❌ Admins only.")
+        return
+    if not ctx.guild or not targets:
+        await reply(ctx, "❌ Mention a role or members, e.g. `!rollteams @Raiders` or `!rollteams @a @b Soul Reaper Melee`.")
+        return
+
+    members = {}
+    for t in targets:
+        for m in (t.members if isinstance(t, discord.Role) else [t]):
+            if not m.bot:
+                members.setdefault(m.id, m)
+    if not members:
+        note = "" if MEMBERS_INTENT else " (role member lists need `MEMBERS_INTENT=1`)"
+        await reply(ctx, f"ℹ️ No members to roll for{note}.")
+        return
+
+    phase_name = await _resolve_phase_for_command(ctx, gs, phase)
+    if not phase_name:
+        return
+    leads, sides, side_pool = choose_sets_for_phase(phase_name)
     if leads is None:
-        await ctx.send("❌ Invalid phase name.")
+        await reply(ctx, invalid_phase_message(phase_name))
+        return
+
+    ids = list(members)
+    depth = history_depth(phase_name)
+    async with gs.dal.locked("teams") as tx:
+        current = await tx.load_teams(ids, phase_name)
+        recent = [{slot: gs.history.recent(uid, slot, depth) for slot in SLOTS} for uid in ids]
+        results = sampler.draw_teams(leads, side_pool, recent, current)
+
+        entries, rolled, failed = [], [], []
+        for uid, (lead, side1, side2, failed_slot) in zip(ids, results):
+            m = members[uid]
+            if failed_slot:
+                failed.append((m, failed_slot))
+                continue
+            gs.history.record(uid, lead=lead, side1=side1, side2=side2)
+            entries.append((uid, str(m), lead, side1, side2))
+            rolled.append((m, *(unit_ids.name(u) for u in (lead, side1, side2))))
+        if entries:
+            await tx.save_teams(phase_name, entries)
+
+    metrics.incr("rollteams_members", len(rolled))
+    pages = rollteams_pages(phase_name, rolled, failed)
+    if len(pages) == 1:
+        await reply(ctx, embed=pages[0])
+        return
+    view = PagedEmbed(pages)
+    sent = await reply(ctx, embed=pages[0], view=view)
+    view.message = await sent
+
+# ========= GUILD ADMINS =========
+def can_manage_admins(ctx):
+    perms = getattr(ctx.author, "guild_permissions", None)
+    return ctx.author.id in ADMINS or bool(ctx.guild and perms and perms.manage_guild)
+
+@bot.command(name="addadmin")
+async def addadmin(ctx, member: discord.Member):
+    if not can_manage_admins(ctx):
+        await reply(ctx, "❌ Needs the **Manage Server** permission.")
+        return
+    gs = await guild_state(ctx)
+    gs.admins.add(member.id)
+    await gs.dal.run_blocking(gs.save_admins)
+    await reply(ctx, f"✅ **{member.display_name}** can now use admin commands here.")
+
+@bot.command(name="removeadmin")
+async def removeadmin(ctx, member: discord.Member):
+    if not can_manage_admins(ctx):
+        await reply(ctx, "❌ Needs the **Manage Server** permission.")
         return
+    gs = await guild_state(ctx)
+    gs.admins.discard(member.id)
+    await gs.dal.run_blocking(gs.save_admins)
+    await reply(ctx, f"✅ **{member.display_name}** removed from this server's admins.")
+
+@bot.command(name="admins")
+async def admins_cmd(ctx):
+    gs = await guild_state(ctx)
+    ids = sorted(gs.admins)
+    if not ids:
+        await reply(ctx, "ℹ️ No server admins set. Use `!addadmin @member`.")
+        return
+    await reply(ctx, "🛡️ **Server admins:** " + ", ".join(f"<@{uid}>" for uid in ids), allowed_mentions=discord.AllowedMentions.none())
 
-    pool = list(sides) + list(leads)
-    current = load_current_team(ctx.author.id, phase_name)
-    prev = _last_rolls.get(ctx.author.id, {})
+@bot.command(name="syncslash")
+async def syncslash(ctx, scope: str = "here"):
+    """
+    Usage:
+      !syncslash           copy the slash commands to this server (instant)
+      !syncslash global    publish them everywhere (can take up to an hour)
+      !syncslash clear     remove this server's copies
+    """
+    if ctx.author.id not in ADMINS:
+        await reply(ctx, "❌ Admins only.")
+        return
+    scope = scope.lower()
+    if scope == "global":
+        synced = await bot.tree.sync()
+        await reply(ctx, f"🔁 Synced **{len(synced)}** slash command(s) globally.")
+        return
+    if not ctx.guild:
+        await reply(ctx, "❌ Run this in a server, or use `!syncslash global`.")
+        return
+    if scope == "clear":
+        bot.tree.clear_commands(guild=ctx.guild)
+    else:
+        bot.tree.copy_global_to(guild=ctx.guild)
+    synced = await bot.tree.sync(guild=ctx.guild)
+    await reply(ctx, f"🔁 Synced **{len(synced)}** slash command(s) to this server.")
+
+@bot.command(name="reloadunits")
+async def reloadunits(ctx):
+    if ctx.author.id not in ADMINS:
+        await reply(ctx, "❌ Admins only.")
+        return
+    await asyncio.get_running_loop().run_in_executor(io_executor, unit_catalog.reload, True)
+    c = unit_catalog.counts()
+    await reply(ctx, f"🔄 Reloaded `{UNITS_FILE}`: **{c['phases']}** phases, **{c['leads']}** leads, **{c['sides']}** sides (builds: {c['builds']}, lookups: {c['lookups']}).")
 
-    options = [u for u in pool if u != current.get("lead") and u != current.get("side1")]
-    side2 = pick_random(options, exclude=[prev.get("side2")])
-    if not side2:
-        await ctx.send("⚠️ No unique Side 2 found.")
+@bot.command(name="stats")
+async def stats(ctx):
+    if ctx.author.id not in ADMINS:
+        await reply(ctx, "❌ Admins only.")
         return
 
-    save_current_team(ctx.author.id, str(ctx.author), phase_name, current.get("lead"), current.get("side1"), side2)
-    _last_rolls.setdefault(ctx.author.id, {})["side2"] = side2
-    await ctx.send(f"🛡️ **Side 2 ({phase_name})**: `{side2}`")
+    def table(title, rows):
+        out = [f"{title:<18} {'calls':>6} {'err':>4} {'p50ms':>7} {'p95ms':>7} {'maxms':>8} {'read':>9} {'written':>9}"]
+        for name, calls, errors, p50, p95, mx, rd, wr in rows[:15]:
+            out.append(f"{name[:18]:<18} {calls:>6} {errors:>4} {p50:>7.1f} {p95:>7.1f} {mx:>8.1f} {rd:>9} {wr:>9}")
+        return out
+
+    c = metrics.counters
+    lines = [f"outbox: {c.get('outbox_messages', 0)} msgs, {c.get('outbox_merged_replies', 0)} replies merged, "
+             f"{c.get('outbox_throttled', 0)} throttle waits, {outbox.pending()} queued", ""]
+    lines += table("command", metrics.summary("commands")) + [""] + table("io op", metrics.summary("io"))
+    head = "📈 **Bot stats** (p50/p95 are histogram bucket bounds)\n```\n"
+    # Drop whole lines (never the fences) to stay under Discord's 2000 characters.
+    budget = 2000 - len(head) - len("\n```") - len("\n…")
+    kept = []
+    for line in lines:
+        budget -= len(line) + 1
+        if budget < 0:
+            kept.append("…")
+            break
+        kept.append(line)
+    await reply(ctx, head + "\n".join(kept) + "\n```")
+
+# ========= PROFILING =========
+profilers = {"cpu": CpuProfile(io_executor), "mem": MemoryProfile()}
+_profile_timers = {}
+
+async def _finish_profile(ctx, kind: str):
+    timer = _profile_timers.pop(kind, None)
+    if timer is not None and timer is not asyncio.current_task():
+        timer.cancel()
+    if kind == "cpu":
+        # cProfile hooks the thread that enabled it, so it must be stopped on the loop thread.
+        text, raw = profilers["cpu"].stop()
+        files = [discord.File(io.BytesIO(text.encode("utf-8")), filename="cpu_profile.txt"),
+                 discord.File(io.BytesIO(raw), filename="cpu_profile.pstats")]
+    else:
+        text = await asyncio.get_running_loop().run_in_executor(io_executor, profilers["mem"].stop)
+        files = [discord.File(io.BytesIO(text.encode("utf-8")), filename="memory_profile.txt")]
+    await reply(ctx, f"📎 {'CPU' if kind == 'cpu' else 'Memory'} profile report:", files=files)
+
+async def _profile_command(ctx, kind: str, action: str, seconds: int):
+    if ctx.author.id not in ADMINS:
+        await reply(ctx, "❌ Admins only.")
+        return
+    prof, name = profilers[kind], ctx.command.name
+    action = (action or "").lower()
+    if action == "stop":
+        if not prof.active:
+            await reply(ctx, f"ℹ️ No {kind} profile running. Start one with `!{name} start [seconds]`.")
+            return
+        await _finish_profile(ctx, kind)
+        return
+    if action != "start":
+        await reply(ctx, f"❌ Usage: `!{name} start [seconds]` or `!{name} stop`.")
+        return
+    if prof.active:
+        await reply(ctx, f"ℹ️ A {kind} profile is already running; `!{name} stop` to get its report.")
+        return
+    prof.start()
+    if seconds > 0:
+        async def stop_later():
+            await asyncio.sleep(min(seconds, 3600))
+            await _finish_profile(ctx, kind)
+        _profile_timers[kind] = asyncio.create_task(stop_later())
+        await reply(ctx, f"⏱️ {kind.upper()} profiling for {min(seconds, 3600)}s; the report will be posted here.")
+    else:
+        await reply(ctx, f"⏱️ {kind.upper()} profiling started; `!{name} stop` for the report.")
+
+@bot.command(name="profile")
+async def profile_cmd(ctx, action: str = "start", seconds: int = 0):
+    """
+    Usage:
+      !profile start [seconds]    cProfile the event loop and I/O threads (stops itself after N seconds)
+      !profile stop               stop and attach the report (+ .pstats file)
+    """
+    await _profile_command(ctx, "cpu", action, seconds)
+
+@bot.command(name="memprofile")
+async def memprofile_cmd(ctx, action: str = "start", seconds: int = 0):
+    """
+    Usage:
+      !memprofile start [seconds] trace allocations (stops itself after N seconds)
+      !memprofile stop            stop and attach growth / top allocation sites
+    """
+    await _profile_command(ctx, "mem", action, seconds)
 
 # ========= HELP =========
 @bot.command(name="gqhelp")
@@ -531,22 +1126,44 @@ async def gqhelp(ctx):
 🎮 **GQ Roulette Bot Commands**
 • `!phases` — Show this week's phases & which window is active (UAE).
 • `!setphases Phase One | Phase Two` — **Admin only**, set both phases for the week.
+• `!reloadunits` — **Bot owner only**, re-read `units.csv` and show unit counts.
+• `!importscores [week]` + CSV attachment — **Admin only**, bulk-load scores for a week.
+• `!exportscores [week|season]` — **Admin only**, download scores as CSV.
+• `!rollteams @Role|@members… [phase]` — **Admin only**, roll a team for everyone listed in one go.
+• `!syncslash [global|clear]` — **Bot owner only**, register the slash commands (this server by default).
+• `!profile start [seconds]` / `!profile stop` — **Bot owner only**, CPU profile report.
+• `!memprofile start [seconds]` / `!memprofile stop` — **Bot owner only**, memory growth report.
+• `!stats` — **Bot owner only**, command latency and file I/O summary (also at `/metrics`).
+• `!addadmin @member` / `!removeadmin @member` / `!admins` — Manage this server's admins (needs Manage Server).
 • `!rerollteam [phase]` — Roll Lead + Side1 + Side2 (cooldown 5m). If no phase given, uses the active one.
 • `!rerolllead [phase]` — Reroll Lead only (cooldown 5m).
 • `!rerollside1 [phase]` — Reroll Side 1 only (cooldown 5m).
 • `!rerollside2 [phase]` — Reroll Side 2 only (cooldown 5m).
+  Rerolls never repeat your last unit for a slot and avoid the few before it.
 • `!submitp1 <score>` — Save Phase 1 score for the **current week**.
 • `!submitp2 <score>` — Save Phase 2 score for the **current week**.
-• `!myscore` — Show your scores for the **current week**.
+• `!myscore` — Show your scores and rank for the **current week**.
+• `!myscore history` — Your weekly totals, season total and season rank.
 • `!leaderboard` — Top totals for the **current week**.
+• `!leaderboard season` / `!leaderboard last N weeks` — Season or multi-week totals.
+
+`/phases`, `/submitp1`, `/submitp2` and the `/reroll…` commands also work as slash commands, with phase-name autocomplete.
 
 🕒 Windows (UAE):
 • Phase 1: Mon 19:00 → Thu 19:00
 • Phase 2: Thu 19:00 → Sun 19:00
 """
-    await ctx.send(msg)
+    await reply(ctx, msg)
 
 # ========= RUN =========
-if not TOKEN:
-    raise SystemExit("Environment variable DISCORD_BOT_TOKEN is not set.")
-bot.run(TOKEN)
+# Guarded so bench.py can import the command callbacks without starting the bot.
+if __name__ == "__main__":
+    if not TOKEN:
+        raise SystemExit("Environment variable DISCORD_BOT_TOKEN is not set.")
+    if HOME_GUILD_ID is None and (legacy := legacy_data_files()):
+        raise SystemExit(
+            f"Found existing data ({', '.join(legacy)}) but HOME_GUILD_ID is not set. Set it to the ID of the "
+            "server this data belongs to; otherwise that server would start from an empty partition.")
+    if KEEP_ALIVE_MODE == "flask":
+        keep_alive(KEEP_ALIVE_PORT)
+    bot.run(TOKEN)
@@ -0,0 +1,165 @@
+import threading, time
+from bisect import bisect_left
+from functools import wraps
+
+# Latency buckets in seconds (Prometheus convention).
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th observation (capped at max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+
+class _Series:
+    __slots__ = ("latency", "calls", "errors", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+class Registry:
+    """
+    Process-wide counters for commands and file/database I/O. I/O is recorded
+    from executor threads, so every update goes through one lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = {}
+        self.io = {}
+        self.counters = {}
+        self.started = time.time()
+
+    def _series(self, table, name):
+        s = table.get(name)
+        if s is None:
+            s = table[name] = _Series()
+        return s
+
+    def observe_command(self, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            s = self._series(self.commands, name)
+            s.calls += 1
+            s.errors += error
+            s.latency.observe(seconds)
+
+    def observe_io(self, op: str, seconds: float, error: bool = False):
+        with self._lock:
+            s = self._series(self.io, op)
+            s.calls += 1
+            s.errors += error
+            s.latency.observe(seconds)
+
+    def add_io_bytes(self, op: str, read: int = 0, written: int = 0):
+        with self._lock:
+            s = self._series(self.io, op)
+            s.bytes_read += read
+            s.bytes_written += written
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # ----- exposition -----
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            lines = [
+                "# HELP gq_uptime_seconds Seconds since the process started.",
+                "# TYPE gq_uptime_seconds gauge",
+                f"gq_uptime_seconds {time.time() - self.started:.3f}",
+            ]
+            for prefix, label, table, what in (("gq_command", "command", self.commands, "Command handler"),
+                                               ("gq_io", "op", self.io, "File/database call")):
+                lines += [
+                    f"# HELP {prefix}_duration_seconds {what} latency.",
+                    f"# TYPE {prefix}_duration_seconds histogram",
+                ]
+                for name, s in sorted(table.items()):
+                    cumulative = 0
+                    for bound, n in zip(BUCKETS + ("+Inf",), s.latency.counts):
+                        cumulative += n
+                        lines.append(f'{prefix}_duration_seconds_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{prefix}_duration_seconds_sum{{{label}="{name}"}} {s.latency.sum:.6f}')
+                    lines.append(f'{prefix}_duration_seconds_count{{{label}="{name}"}} {s.latency.count}')
+                for metric, attr in (("calls_total", "calls"), ("errors_total", "errors")):
+                    lines.append(f"# TYPE {prefix}_{metric} counter")
+                    for name, s in sorted(table.items()):
+                        lines.append(f'{prefix}_{metric}{{{label}="{name}"}} {getattr(s, attr)}')
+            for metric, attr in (("read_bytes_total", "bytes_read"), ("written_bytes_total", "bytes_written")):
+                lines.append(f"# TYPE gq_io_{metric} counter")
+                for name, s in sorted(self.io.items()):
+                    lines.append(f'gq_io_{metric}{{op="{name}"}} {getattr(s, attr)}')
+            for name, n in sorted(self.counters.items()):
+                lines.append(f"# TYPE gq_{name}_total counter")
+                lines.append(f"gq_{name}_total {n}")
+            return "\n".join(lines) + "\n"
+
+    def summary(self, table: str):
+        """[(name, calls, errors, p50_ms, p95_ms, max_ms, bytes_read, bytes_written)] sorted by calls."""
+        with self._lock:
+            src = self.commands if table == "commands" else self.io
+            rows = [
+                (name, s.calls, s.errors, s.latency.quantile(0.5) * 1000, s.latency.quantile(0.95) * 1000,
+                 s.latency.max * 1000, s.bytes_read, s.bytes_written)
+                for name, s in src.items()
+            ]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows
+
+
+registry = Registry()
+
+
+def call_io(op: str, fn, *args):
+    """Call a blocking I/O function, recording its latency and errors under `op`."""
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args)
+    except Exception:
+        registry.observe_io(op, time.perf_counter() - t0, error=True)
+        raise
+    registry.observe_io(op, time.perf_counter() - t0)
+    return result
+
+
+def instrument_io(op: str):
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args):
+            return call_io(op, fn, *args)
+        return wrapper
+    return deco
+
+
+def add_io_bytes(op: str, read: int = 0, written: int = 0):
+    registry.add_io_bytes(op, read, written)
@@ -0,0 +1,156 @@
+import asyncio, time
+from collections import deque
+
+import discord
+
+from metrics import registry
+
+EMBED_FIELDS = 25        # Discord limits per embed
+EMBED_CHARS = 6000
+
+
+class _Bucket:
+    """Token bucket mirroring a channel's message rate limit (`rate` sends per `per` seconds)."""
+
+    __slots__ = ("rate", "per", "tokens", "stamp", "clock")
+
+    def __init__(self, rate: int, per: float, clock):
+        self.rate, self.per, self.clock = rate, per, clock
+        self.tokens = float(rate)
+        self.stamp = clock()
+
+    def wait_time(self):
+        now = self.clock()
+        self.tokens = min(self.rate, self.tokens + (now - self.stamp) * self.rate / self.per)
+        self.stamp = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) * self.per / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _Item:
+    __slots__ = ("ctx", "content", "embed", "summary", "kwargs", "sent")
+
+    def __init__(self, ctx, content, embed, summary, kwargs, sent):
+        self.ctx, self.content, self.embed, self.summary = ctx, content, embed, summary
+        self.kwargs = kwargs    # file/files/view etc., passed through to send()
+        self.sent = sent        # future -> the Message (None if dropped or failed)
+
+
+class Outbox:
+    """
+    Per-channel outbound queue for prefix-command replies. Every handler
+    reply goes through it, so the bucket sees all of a channel's sends.
+
+    Each channel has one worker draining its queue in order, paced by a token
+    bucket so we stay under the channel's send limit instead of running into
+    429s. While a channel is quiet every reply goes out exactly as the handler
+    built it. When replies back up (`coalesce_at` or more waiting), queued
+    replies that carry a `summary` line are merged into one embed, one field
+    per user, so a reroll storm costs a few messages instead of dozens.
+
+    Slash-command replies skip the queue: they answer an interaction token,
+    which has its own deadline and limits.
+    """
+
+    def __init__(self, rate: int = 5, per: float = 5.0, coalesce_at: int = 3, clock=time.monotonic):
+        self.rate, self.per = rate, per
+        self.coalesce_at = coalesce_at
+        self.clock = clock
+        self._queues = {}
+        self._buckets = {}
+        self._workers = {}
+
+    def pending(self):
+        return sum(len(q) for q in self._queues.values())
+
+    async def send(self, ctx, content=None, *, embed=None, summary=None, **kwargs):
+        """
+        Queue a reply to ctx's channel. `summary` is a one-line version of the
+        reply (e.g. "Soul Reaper Melee: A · B · C") used when it gets merged;
+        replies with attachments or views (`kwargs`) are never merged.
+        Returns a future for the sent Message (None if it failed or was dropped).
+        """
+        sent = asyncio.get_running_loop().create_future()
+        channel = getattr(ctx, "channel", None)
+        if getattr(ctx, "interaction", None) is not None or channel is None:
+            sent.set_result(await ctx.send(content, embed=embed, **kwargs))
+            return sent
+        key = channel.id
+        q = self._queues.get(key)
+        if q is None:
+            q = self._queues[key] = deque()
+        q.append(_Item(ctx, content, embed, None if kwargs else summary, kwargs, sent))
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key, q))
+        return sent
+
+    def _bucket(self, key):
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = _Bucket(self.rate, self.per, self.clock)
+        return b
+
+    async def _drain(self, key, q):
+        bucket = self._bucket(key)
+        try:
+            while q:
+                wait = bucket.wait_time()
+                if wait > 0:
+                    registry.incr("outbox_throttled")
+                    await asyncio.sleep(wait)
+                    continue
+                bucket.take()
+                batch = self._take_batch(q)
+                message = None
+                try:
+                    if len(batch) == 1:
+                        item = batch[0]
+                        message = await item.ctx.send(item.content, embed=item.embed, **item.kwargs)
+                    else:
+                        message = await batch[0].ctx.channel.send(embed=self._merged(batch))
+                        registry.incr("outbox_merged_replies", len(batch))
+                    registry.incr("outbox_messages")
+                except discord.HTTPException as e:
+                    registry.incr("outbox_errors")
+                    print(f"[outbox] channel {key}: {e!r}")
+                finally:
+                    for item in batch:
+                        if not item.sent.done():
+                            item.sent.set_result(message)
+        finally:
+            self._workers.pop(key, None)
+            if not q:
+                self._queues.pop(key, None)
+
+    def _take_batch(self, q):
+        if len(q) < self.coalesce_at or q[0].summary is None:
+            return [q.popleft()]
+        batch, chars = [], 0
+        while q and q[0].summary is not None and len(batch) < EMBED_FIELDS:
+            name = str(q[0].ctx.author.display_name)[:256]
+            size = len(name) + len(q[0].summary[:1024])
+            if chars + size > EMBED_CHARS - 100:
+                break
+            batch.append(q.popleft())
+            chars += size
+        return batch
+
+    def _merged(self, batch):
+        embed = discord.Embed(title=f"📨 {len(batch)} replies", color=0x00ffcc)
+        for item in batch:
+            embed.add_field(name=str(item.ctx.author.display_name)[:256], value=item.summary[:1024], inline=False)
+        return embed
+
+    async def close(self, timeout: float = 5.0):
+        """Give queued replies up to `timeout` seconds to go out, then drop the rest."""
+        workers = list(self._workers.values())
+        if workers:
+            _, stuck = await asyncio.wait(workers, timeout=timeout)
+            for task in stuck:
+                task.cancel()
+        for q in self._queues.values():  # never sent: release anyone awaiting them
+            for item in q:
+                if not item.sent.done():
+                    item.sent.set_result(None)
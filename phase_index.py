@@ -0,0 +1,88 @@
+import re
+from bisect import bisect_left
+
+
+def normalize(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "").strip()).lower()
+
+
+def _is_subsequence(needle: str, hay: str) -> bool:
+    it = iter(hay)
+    return all(ch in it for ch in needle)
+
+
+def _prefix_range(keys, q):
+    """Positions in sorted `keys` of the entries starting with `q`."""
+    i = bisect_left(keys, q)
+    while i < len(keys) and keys[i].startswith(q):
+        yield i
+        i += 1
+
+
+class PhaseIndex:
+    """
+    Immutable lookup over phase names for autocomplete and lenient matching.
+    Everything is precomputed at build time; a query is a couple of bisects
+    plus, only when those find too little, a scan of the (short) name list.
+
+    Matches are ranked: whole-name prefix, then word prefix ("melee" finds
+    "Soul Reaper Melee"), then fuzzy (the query's letters appear in order).
+    """
+
+    def __init__(self, names=()):
+        by_key = {}
+        for name in names:
+            by_key.setdefault(normalize(name), name)
+        self._keys = sorted(by_key)
+        self._names = [by_key[k] for k in self._keys]
+        # Every later word of every name, sorted, pointing back at the name.
+        words = sorted(
+            (key[m.start():], i)
+            for i, key in enumerate(self._keys)
+            for m in re.finditer(r"(?<=[ \-/(])\S", key)
+        )
+        self._word_keys = [w for w, _ in words]
+        self._word_pos = [i for _, i in words]
+        self._compact = [k.replace(" ", "") for k in self._keys]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _prefix_hits(self, q):
+        yield from _prefix_range(self._keys, q)
+        for j in _prefix_range(self._word_keys, q):
+            yield self._word_pos[j]
+
+    def complete(self, query: str, limit: int = 25):
+        """Up to `limit` display names matching `query`, best first."""
+        q = normalize(query)
+        if not q:
+            return self._names[:limit]
+        hits = {}  # insertion-ordered set
+        for i in self._prefix_hits(q):
+            hits[i] = None
+            if len(hits) >= limit:
+                return [self._names[i] for i in hits]
+        compact_q = q.replace(" ", "")
+        for i, compact in enumerate(self._compact):
+            if i not in hits and _is_subsequence(compact_q, compact):
+                hits[i] = None
+                if len(hits) >= limit:
+                    break
+        return [self._names[i] for i in hits]
+
+    def resolve(self, query: str):
+        """
+        The display name `query` refers to: an exact (case/space-insensitive)
+        match, or the only name it is a whole-name or word prefix of. Else None.
+        """
+        q = normalize(query)
+        if not q:
+            return None
+        i = bisect_left(self._keys, q)
+        if i < len(self._keys) and self._keys[i] == q:
+            return self._names[i]
+        hits = set(self._prefix_hits(q))
+        if len(hits) == 1:
+            return self._names[hits.pop()]
+        return None
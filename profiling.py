@@ -0,0 +1,110 @@
+import cProfile, io, linecache, marshal, pstats, threading, time, tracemalloc
+
+# Frames from the profilers themselves are noise in the reports.
+_NOISE = (tracemalloc.__file__, linecache.__file__, "<frozen importlib._bootstrap>", "<unknown>")
+
+
+class CpuProfile:
+    """
+    cProfile around everything the event loop thread runs (command dispatch,
+    handlers, tasks) between start() and stop(), plus every job of
+    `executor` (a data_access.IoExecutor), each worker thread with its own
+    profile, merged in the report. Nothing is hooked while it is off.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor
+        self._prof = None
+        self._workers = {}   # thread name -> cProfile.Profile
+        self.started = None
+
+    @property
+    def active(self):
+        return self._prof is not None
+
+    def start(self):
+        if self._prof is not None:
+            raise RuntimeError("CPU profile already running")
+        self._prof = cProfile.Profile()
+        self._workers = {}
+        self.started = time.monotonic()
+        self._prof.enable()
+        if self.executor is not None:
+            self.executor.wrap = self._traced
+
+    def _traced(self, fn):
+        def run(*args, **kwargs):
+            name = threading.current_thread().name
+            prof = self._workers.get(name)
+            if prof is None:
+                prof = self._workers[name] = cProfile.Profile()
+            return prof.runcall(fn, *args, **kwargs)
+        return run
+
+    def stop(self, top: int = 30):
+        """Stop and return (text report, raw pstats bytes for snakeviz/pstats)."""
+        prof, self._prof = self._prof, None
+        if prof is None:
+            raise RuntimeError("no CPU profile running")
+        if self.executor is not None:
+            self.executor.wrap = None
+        prof.disable()
+        took = time.monotonic() - self.started
+        workers = dict(self._workers)
+        stats = pstats.Stats(prof)
+        for p in workers.values():
+            stats.add(p)
+        raw = marshal.dumps(stats.stats)
+        threads = ", ".join([f"event loop ({threading.current_thread().name})", *sorted(workers)])
+        out = io.StringIO()
+        stats.stream = out
+        stats.strip_dirs()
+        out.write(f"CPU profile over {took:.1f}s\nThreads covered: {threads}\n"
+                  "(other threads, e.g. the Flask keep-alive server, are not traced)\n\n=== by cumulative time ===\n")
+        stats.sort_stats("cumulative").print_stats(top)
+        out.write("\n=== by own time ===\n")
+        stats.sort_stats("tottime").print_stats(top)
+        return out.getvalue(), raw
+
+
+class MemoryProfile:
+    """tracemalloc snapshot at start(), diffed against one at stop(). Tracing is off otherwise."""
+
+    def __init__(self):
+        self._base = None
+        self.started = None
+
+    @property
+    def active(self):
+        return self._base is not None
+
+    def start(self, frames: int = 10):
+        if self._base is not None:
+            raise RuntimeError("memory profile already running")
+        tracemalloc.start(frames)
+        self.started = time.monotonic()
+        self._base = tracemalloc.take_snapshot()
+
+    def stop(self, top: int = 25):
+        """Stop tracing and return a text report of growth and current top allocation sites."""
+        base, self._base = self._base, None
+        if base is None:
+            raise RuntimeError("no memory profile running")
+        snap = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        filters = [tracemalloc.Filter(False, f) for f in _NOISE]
+        base, snap = base.filter_traces(filters), snap.filter_traces(filters)
+        took = time.monotonic() - self.started
+
+        out = io.StringIO()
+        out.write(f"Memory profile over {took:.1f}s: traced {current / 1024:.0f} KiB now, peak {peak / 1024:.0f} KiB\n")
+        out.write(f"\n=== top {top} growth by line ===\n")
+        for d in snap.compare_to(base, "lineno")[:top]:
+            out.write(f"{d.size_diff / 1024:+10.1f} KiB {d.count_diff:+8d} blocks  {d.traceback}\n")
+        out.write(f"\n=== top {top} allocation sites now (with callers) ===\n")
+        for st in snap.statistics("traceback")[:top]:
+            out.write(f"{st.size / 1024:10.1f} KiB {st.count:8d} blocks\n")
+            for line in st.traceback.format(limit=6, most_recent_first=True):
+                out.write(f"    {line}\n")
+        return out.getvalue()
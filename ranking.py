@@ -0,0 +1,122 @@
+import heapq
+from datetime import date, timedelta
+from bisect import bisect_left, insort
+
+from records import SeasonTotal
+
+
+class Ranking:
+    """
+    Rows (records with user_id and total) kept ordered by total (desc), then
+    user_id. Updates and rank lookups are a bisect on the sorted key list.
+    Used for each week and for the season totals.
+    """
+
+    def __init__(self, rows=()):
+        self._rows = {}
+        for row in rows:
+            self._rows[row.user_id] = row
+        self._keys = sorted(self._key(r) for r in self._rows.values())
+
+    @staticmethod
+    def _key(row):
+        return (-row.total, row.user_id)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows.values())
+
+    def update(self, row):
+        old = self._rows.get(row.user_id)
+        if old is not None:
+            i = bisect_left(self._keys, self._key(old))
+            del self._keys[i]
+        self._rows[row.user_id] = row
+        insort(self._keys, self._key(row))
+
+    def row(self, user_id: int):
+        return self._rows.get(user_id)
+
+    def top(self, k: int = 10):
+        return [self._rows[uid] for _, uid in self._keys[:k]]
+
+    def rank(self, user_id: int):
+        """1-based position of a user, or None if they have no row."""
+        row = self._rows.get(user_id)
+        if row is None:
+            return None
+        return bisect_left(self._keys, self._key(row)) + 1
+
+
+def _season_entry(prev, row, delta, new_week):
+    return SeasonTotal(row.user_id, row.username, (prev.total if prev else 0) + delta, (prev.weeks if prev else 0) + new_week)
+
+
+class Leaderboards:
+    """
+    All score history, pre-aggregated in memory:
+      - a Ranking per week_start,
+      - a season Ranking of per-user running totals (weeks >= season_start),
+      - per-user week history.
+    Built once from storage with load_all(), then maintained by update().
+    """
+
+    def __init__(self, season_start: str = ""):
+        self.season_start = season_start or ""
+        self.loaded = False
+        self.weeks = {}
+        self.user_weeks = {}    # user_id -> {week_start: total}
+        self.season = Ranking()
+
+    def load_all(self, rows):
+        by_week = {}
+        for row in rows:
+            by_week.setdefault(row.week_start, []).append(row)
+        self.weeks = {w: Ranking(rs) for w, rs in by_week.items()}
+        self.user_weeks = {}
+        season = {}
+        for week_start, ranking in self.weeks.items():
+            for row in ranking:
+                self.user_weeks.setdefault(row.user_id, {})[week_start] = row.total
+                if week_start >= self.season_start:
+                    season[row.user_id] = _season_entry(season.get(row.user_id), row, row.total, 1)
+        self.season = Ranking(season.values())
+        self.loaded = True
+
+    def week(self, week_start: str):
+        ranking = self.weeks.get(week_start)
+        if ranking is None:
+            ranking = self.weeks[week_start] = Ranking()
+        return ranking
+
+    def update(self, row):
+        week_start = row.week_start
+        ranking = self.week(week_start)
+        old = ranking.row(row.user_id)
+        delta = row.total - (old.total if old else 0)
+        ranking.update(row)
+        self.user_weeks.setdefault(row.user_id, {})[week_start] = row.total
+        if week_start >= self.season_start:
+            prev = self.season.row(row.user_id)
+            self.season.update(_season_entry(prev, row, delta, 0 if old else 1))
+
+    def last_weeks(self, week_start: str, n: int, k: int = 10):
+        """(weeks with scores, top k users by summed totals) for the n calendar weeks ending at week_start."""
+        first = (date.fromisoformat(week_start) - timedelta(days=7 * (n - 1))).isoformat()
+        weeks = sorted(w for w in self.weeks if first <= w <= week_start and len(self.weeks[w]))
+        totals = {}
+        for w in weeks:
+            for row in self.weeks[w]:
+                t = totals.get(row.user_id)
+                if t is None:
+                    totals[row.user_id] = _season_entry(None, row, row.total, 1)
+                else:
+                    t.total += row.total
+                    t.weeks += 1
+        return weeks, heapq.nsmallest(k, totals.values(), key=Ranking._key)
+
+    def history(self, user_id: int):
+        """[(week_start, total)] newest first."""
+        return sorted(self.user_weeks.get(user_id, {}).items(), reverse=True)
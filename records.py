@@ -0,0 +1,109 @@
+import threading
+from array import array
+
+
+# ========= UNIT IDS =========
+class UnitRegistry:
+    """
+    Interns unit names to small integer IDs, once per process. IDs start at 1
+    (0 means "no unit") and are never reused or renumbered, so pools, saved
+    teams and roll history can all hold plain ints and compare them directly.
+    Names only come back out when a message is built or a file is written.
+    Files keep storing names; IDs are not stable across restarts.
+    """
+
+    MAX_ID = 0xFFFF  # IDs live in array('H') pools and history rings
+
+    def __init__(self):
+        self._ids = {}
+        self._names = [None]
+        self._lock = threading.Lock()  # interning runs on executor threads and the loop
+
+    def __len__(self):
+        return len(self._names) - 1
+
+    def id(self, name):
+        """ID for a unit name, interning it on first sight; 0 for None/empty."""
+        if not name:
+            return 0
+        i = self._ids.get(name)
+        if i is None:
+            with self._lock:
+                i = self._ids.get(name)
+                if i is None:
+                    i = len(self._names)
+                    if i > self.MAX_ID:
+                        raise OverflowError("too many distinct unit names")
+                    # Publish the name before the id so a lock-free reader never sees an id without it.
+                    self._names.append(name)
+                    self._ids[name] = i
+        return i
+
+    def name(self, unit_id):
+        """Display name for an ID; None for 0."""
+        return self._names[unit_id]
+
+    def ids(self, names):
+        return array("H", (self.id(n) for n in names))
+
+
+unit_ids = UnitRegistry()
+
+
+# ========= ROW RECORDS =========
+class ScoreRecord:
+    """One (user, week) score row. Scores are parsed to int once, on construction."""
+
+    __slots__ = ("user_id", "username", "week_start", "phase1", "phase2", "total")
+
+    def __init__(self, user_id, username, week_start, phase1, phase2):
+        self.user_id = int(user_id)
+        self.username = username
+        self.week_start = week_start
+        self.phase1 = int(phase1 or 0)
+        self.phase2 = int(phase2 or 0)
+        self.total = self.phase1 + self.phase2
+
+    def as_row(self):
+        """Values in SCORE_FIELDS order, for CSV/SQL writers."""
+        return (self.user_id, self.username, self.week_start, self.phase1, self.phase2, self.total)
+
+    def __repr__(self):
+        return f"ScoreRecord{self.as_row()!r}"
+
+
+class SeasonTotal:
+    """A user's summed totals over several weeks (season and last-N rankings)."""
+
+    __slots__ = ("user_id", "username", "total", "weeks")
+
+    def __init__(self, user_id, username, total, weeks):
+        self.user_id, self.username, self.total, self.weeks = user_id, username, total, weeks
+
+
+class TeamRecord:
+    """A user's saved team for one phase. lead/side1/side2 are unit IDs (0 = empty)."""
+
+    __slots__ = ("user_id", "username", "phase", "lead", "side1", "side2", "updated_at")
+
+    def __init__(self, user_id, username, phase, lead=0, side1=0, side2=0, updated_at=""):
+        self.user_id = int(user_id)
+        self.username, self.phase = username, phase
+        self.lead, self.side1, self.side2 = lead, side1, side2
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_names(cls, user_id, username, phase, lead, side1, side2, updated_at=""):
+        return cls(user_id, username, phase, unit_ids.id(lead), unit_ids.id(side1), unit_ids.id(side2), updated_at)
+
+    def as_row(self):
+        """Values in TEAM_FIELDS order, unit names resolved, "" for empty slots."""
+        name = unit_ids.name
+        return (self.user_id, self.username, self.phase,
+                name(self.lead) or "", name(self.side1) or "", name(self.side2) or "", self.updated_at)
+
+    def __repr__(self):
+        return f"TeamRecord{self.as_row()!r}"
+
+
+EMPTY_TEAM = TeamRecord(0, "", "")
@@ -0,0 +1,93 @@
+import json, os
+from array import array
+from collections import OrderedDict
+
+from records import unit_ids
+from storage import atomic_write
+
+SLOTS = ("lead", "side1", "side2")
+
+
+class RollHistory:
+    """
+    Each user's most recent rolls per slot, for "don't give me my last N".
+
+    A user is one array('H'): three ring write positions followed by a ring
+    of `capacity` unit IDs (records.unit_ids) per slot, 0 = empty cell. At
+    most `max_users` users stay resident; the one who rolled least recently
+    is dropped first. The saved file holds names, since IDs are per process.
+    """
+
+    def __init__(self, capacity: int = 8, max_users: int = 10_000):
+        self.capacity = max(1, capacity)
+        self.max_users = max_users
+        self._users = OrderedDict()
+        self.dirty = False
+
+    def __len__(self):
+        return len(self._users)
+
+    def recent(self, user_id: int, slot: str, n: int):
+        """Up to n unit IDs last rolled into `slot`, newest first."""
+        buf = self._users.get(user_id)
+        if buf is None:
+            return ()
+        self._users.move_to_end(user_id)
+        s, cap = SLOTS.index(slot), self.capacity
+        base, head = 3 + s * cap, buf[s]
+        out = []
+        for k in range(1, min(n, cap) + 1):
+            uid = buf[base + (head - k) % cap]
+            if not uid:
+                break
+            out.append(uid)
+        return tuple(out)
+
+    def push(self, user_id: int, slot: str, unit_id: int):
+        if not unit_id:
+            return
+        buf = self._users.get(user_id)
+        if buf is None:
+            buf = self._users[user_id] = array("H", bytes(2 * (3 + 3 * self.capacity)))
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        s, cap = SLOTS.index(slot), self.capacity
+        buf[3 + s * cap + buf[s]] = unit_id
+        buf[s] = (buf[s] + 1) % cap
+        self.dirty = True
+
+    def record(self, user_id: int, **rolled):
+        """push() several slots at once: record(uid, lead=..., side1=..., side2=...)."""
+        for slot, unit_id in rolled.items():
+            self.push(user_id, slot, unit_id)
+
+    # ----- persistence -----
+    def to_json(self):
+        return {
+            "capacity": self.capacity,
+            "users": {str(uid): {slot: [unit_ids.name(i) for i in self.recent(uid, slot, self.capacity)] for slot in SLOTS}
+                      for uid in list(self._users)},
+        }
+
+    def restore(self, data: dict):
+        for uid, slots in (data.get("users") or {}).items():
+            for slot in SLOTS:
+                for name in reversed(slots.get(slot, [])[:self.capacity]):
+                    self.push(int(uid), slot, unit_ids.id(name))
+        self.dirty = False
+
+    @staticmethod
+    def write(path: str, data: dict):
+        """Blocking: save a to_json() taken on the thread that pushes (it isn't thread-safe)."""
+        atomic_write(path, lambda f: json.dump(data, f))
+
+    def load(self, path: str):
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.restore(json.load(f))
+        except Exception:
+            pass
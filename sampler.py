@@ -0,0 +1,170 @@
+import random
+
+try:
+    import numpy as np
+except ImportError:  # a runtime dependency; without it batch rolls fall back to one pick() at a time
+    np = None
+
+SLOTS = ("lead", "side1", "side2")
+NONE = -1  # "no unit" in the numpy id arrays; never equal to a pool id
+
+
+class Sampler:
+    """
+    Draws units from the cached per-phase pools without copying them.
+    Pools and exclusions are unit IDs; 0 (no unit) is never excluded.
+
+    pick() does rejection sampling over random indices; exclusion sets are
+    tiny (a handful of units), so a hit is found in one or two tries. If the
+    pool is mostly excluded it falls back to filtering once.
+    """
+
+    def __init__(self, seed=None, max_tries: int = 8, vector_min: int = 32):
+        self.rng = random.Random(seed)
+        self.max_tries = max_tries
+        self.vector_min = vector_min  # draw_teams() batches smaller than this skip numpy
+        self._np_rng = None
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+        self._np_rng = None
+
+    def pick(self, pool, exclude=(), avoid=()):
+        """
+        A uniformly random entry of `pool` not in `exclude`, or 0.
+        `avoid` (older roll history) is excluded too unless that would
+        leave nothing to pick.
+        """
+        if avoid:
+            x = self._pick(pool, {e for e in exclude if e}.union(avoid))
+            if x:
+                return x
+        return self._pick(pool, {e for e in exclude if e})
+
+    def _pick(self, pool, exclude):
+        n = len(pool)
+        if not n:
+            return 0
+        randrange = self.rng.randrange
+        for _ in range(self.max_tries):
+            x = pool[randrange(n)]
+            if x not in exclude:
+                return x
+        candidates = [x for x in pool if x not in exclude]
+        if not candidates:
+            return 0
+        return self.rng.choice(candidates)
+
+    def draw_team(self, leads, side_pool, recent: dict, current):
+        """
+        Roll lead + two distinct sides with the !rerollteam exclusion rules.
+        `current` is the saved TeamRecord; `recent` maps slot -> that slot's
+        roll history, newest first: the newest is always excluded, older ones
+        when the pool allows. Returns (lead, side1, side2, failed_slot);
+        failed_slot is None on success, otherwise "lead", "side1" or "side2".
+        """
+        hist = {slot: tuple(recent.get(slot) or ()) for slot in SLOTS}
+        lead = self.pick(leads, (*hist["lead"][:1], current.side1, current.side2), hist["lead"][1:])
+        if not lead:
+            return 0, 0, 0, "lead"
+        side1 = self.pick(side_pool, (lead, *hist["side1"][:1], current.lead, current.side2), hist["side1"][1:])
+        if not side1:
+            return lead, 0, 0, "side1"
+        side2 = self.pick(side_pool, (lead, side1, *hist["side2"][:1], current.lead, current.side1), hist["side2"][1:])
+        if not side2:
+            return lead, side1, 0, "side2"
+        return lead, side1, side2, None
+
+    def draw_teams(self, leads, side_pool, recent, current):
+        """
+        draw_team() for many users at once: `recent` and `current` are
+        parallel lists (one history dict and TeamRecord per user). Returns a
+        list of (lead, side1, side2, failed_slot) in the same order. With
+        numpy the whole batch is one vectorized pass (roll_teams()).
+        """
+        n = len(current)
+        if np is None or n < self.vector_min:
+            return [self.draw_team(leads, side_pool, r, c) for r, c in zip(recent, current)]
+        if self._np_rng is None:
+            self._np_rng = np.random.default_rng(self.rng.getrandbits(64))  # follows the seed
+
+        depth = max([len(r.get(slot) or ()) for r in recent for slot in SLOTS] + [1])
+        hist = np.full((n, 3, depth), NONE, dtype=np.int64)
+        for i, r in enumerate(recent):
+            for s, slot in enumerate(SLOTS):
+                h = r.get(slot) or ()
+                hist[i, s, :len(h)] = h
+        cur = np.array([(c.lead, c.side1, c.side2) for c in current], dtype=np.int64)
+        cur[cur == 0] = NONE
+        lead, side1, side2 = roll_teams(self._np_rng, np.asarray(leads, dtype=np.int64),
+                                        np.asarray(side_pool, dtype=np.int64), cur, hist)
+
+        out = []
+        for l, s1, s2 in zip(lead.tolist(), side1.tolist(), side2.tolist()):
+            if l == NONE:
+                out.append((0, 0, 0, "lead"))
+            elif s1 == NONE:
+                out.append((l, 0, 0, "side1"))
+            elif s2 == NONE:
+                out.append((l, s1, 0, "side2"))
+            else:
+                out.append((l, s1, s2, None))
+        return out
+
+
+# ========= VECTORIZED ROLLS (numpy) =========
+def draw(rng, pool, exclude, max_tries: int = 8):
+    """
+    Vectorized Sampler.pick(): for each row of `exclude` (unit ids, NONE
+    padded) a uniformly random pool position whose unit is not excluded.
+    Returns the unit ids, NONE where every position was excluded.
+
+    Same strategy as pick(): a few rounds of rejection sampling for every
+    row at once, then an exact masked draw for the rows still rejected.
+    """
+    out = np.full(len(exclude), NONE, dtype=np.int64)
+    if not len(pool):
+        return out
+    todo = np.arange(len(exclude))
+    for _ in range(max_tries):
+        cand = pool[rng.integers(0, len(pool), len(todo))]
+        hit = (cand[:, None] == exclude[todo]).any(axis=1)
+        out[todo[~hit]] = cand[~hit]
+        todo = todo[hit]
+        if not len(todo):
+            return out
+    ex = exclude[todo]
+    allowed = np.ones((len(todo), len(pool)), dtype=bool)
+    for j in range(ex.shape[1]):
+        allowed &= pool[None, :] != ex[:, j, None]
+    count = allowed.sum(axis=1)
+    r = (rng.random(len(todo)) * count).astype(np.int64)
+    pos = (allowed.cumsum(axis=1) > r[:, None]).argmax(axis=1)
+    out[todo] = np.where(count > 0, pool[pos], NONE)
+    return out
+
+
+def draw_avoiding(rng, pool, exclude, avoid):
+    """Sampler.pick() with `avoid`: dropped for the rows where it leaves nothing."""
+    if not avoid.shape[1]:
+        return draw(rng, pool, exclude)
+    out = draw(rng, pool, np.concatenate([exclude, avoid], axis=1))
+    miss = out == NONE
+    if miss.any():
+        out[miss] = draw(rng, pool, exclude[miss])
+    return out
+
+
+def roll_teams(rng, leads, side_pool, cur, hist):
+    """
+    Sampler.draw_team() for every row at once. `cur` is (users, 3) saved
+    lead/side1/side2 ids, `hist` (users, 3, depth) each slot's history newest
+    first, both NONE padded. Returns the lead, side1 and side2 id arrays;
+    NONE marks the slot a row failed at (later slots are then meaningless).
+    """
+    c = cur.T
+    last, older = hist[:, :, 0].T, hist[:, :, 1:]
+    lead = draw_avoiding(rng, leads, np.stack([last[0], c[1], c[2]], axis=1), older[:, 0])
+    s1 = draw_avoiding(rng, side_pool, np.stack([lead, last[1], c[0], c[2]], axis=1), older[:, 1])
+    s2 = draw_avoiding(rng, side_pool, np.stack([lead, s1, last[2], c[0], c[1]], axis=1), older[:, 2])
+    return lead, s1, s2
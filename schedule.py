@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+
+class ScheduleCache:
+    """
+    Caches the current week_info() result until the next schedule boundary
+    (Mon/Thu/Sun 19:00), plus the phases map until it is invalidated.
+
+    `compute` returns the week_info tuple for "now":
+        (week_start, active, phase1_start, phase1_end, phase2_end)
+    """
+
+    def __init__(self, compute, clock=time.time):
+        self.compute = compute
+        self.clock = clock
+        self._week = None
+        self._valid_until = 0.0
+        self._phases = None
+        self.recomputes = 0
+
+    def current(self):
+        if self._week is None or self.clock() >= self._valid_until:
+            self._week = self.compute()
+            self._valid_until = self.next_boundary(self._week).timestamp()
+            self.recomputes += 1
+        return self._week
+
+    @staticmethod
+    def next_boundary(week):
+        _, active, p1_start, p1_end, p2_end = week
+        if active == "phase1":
+            return p1_end
+        if active == "phase2":
+            return p2_end
+        return p1_start + timedelta(days=7)
+
+    # ----- phases map -----
+    @property
+    def phases(self):
+        """The cached phases map, or None when it needs reloading."""
+        return self._phases
+
+    def set_phases(self, phases_map: dict):
+        self._phases = phases_map
+
+    def invalidate_phases(self):
+        self._phases = None
+
+    def active_phase_name(self):
+        """(week_start, active_slot, phase_name or None); needs phases loaded."""
+        week_start, active, *_ = self.current()
+        entry = (self._phases or {}).get(week_start) or {}
+        return week_start, active, entry.get(active) if active else None
@@ -0,0 +1,272 @@
+"""
+Monte Carlo fairness check for the roll logic.
+
+Replays many !rerollteam / !rerolllead / !rerollside1 / !rerollside2 rolls
+for every phase in units.csv with NumPy, applying the same exclusion rules
+as the bot (the slot's roll history, the other slots of the current team),
+and reports how often each unit comes up.
+
+    python simulate.py                           # every phase, 250k !rerollteam each
+    python simulate.py --mode side1 --rolls 2000000
+    python simulate.py --phase "Soul Reaper Melee" --units --depth 5
+    python simulate.py --csv freqs.csv
+
+The exclusions skew a correct sampler away from a plain uniform draw, so
+each slot is checked against a reference run: the same commands replayed
+one user at a time through sampler.Sampler, the bot's per-command path. A
+slot is flagged (*) when its frequencies differ from the reference (two-
+sample chi-square) or a roll hit an exhausted pool (the bot's "⚠️ Not
+enough ..." replies). Also reported: the p-value against the uniform-by-
+position expectation (multiplicity / pool size; informational only) and
+the least/most picked unit relative to it. Needs numpy (pip install numpy).
+"""
+import argparse, csv, math, time
+
+try:
+    import numpy as np
+except ImportError:  # listed in requirements.txt; fail with a hint below instead of a traceback
+    np = None
+
+from records import TeamRecord, unit_ids
+from sampler import NONE, Sampler, draw_avoiding, roll_teams
+from units import UnitCatalog
+
+MODES = ("team", "lead", "side1", "side2")
+
+
+# ========= VECTORIZED ROLLS =========
+def _push(hist, ok, slot, ids):
+    h = hist[ok, slot]
+    h[:, 1:] = h[:, :-1]
+    h[:, 0] = ids
+    hist[ok, slot] = h
+
+
+def roll(rng, mode, leads, side_pool, cur, hist):
+    """
+    One command for every simulated user. `cur` is the saved team, a (users, 3)
+    array of lead/side1/side2 ids; `hist` is (users, 3, depth), each slot's
+    roll history newest first. Both are updated in place on success like
+    main.py does. Returns ({slot: ids rolled by users that succeeded},
+    {slot: failure count}).
+    """
+    if mode == "team":
+        lead, s1, s2 = roll_teams(rng, leads, side_pool, cur, hist)
+        fail_lead = lead == NONE
+        fail_s1 = ~fail_lead & (s1 == NONE)
+        fail_s2 = ~fail_lead & ~fail_s1 & (s2 == NONE)
+        ok = ~(fail_lead | fail_s1 | fail_s2)
+        team = np.stack([lead, s1, s2], axis=1)[ok]
+        cur[ok] = team
+        for slot in range(3):
+            _push(hist, ok, slot, team[:, slot])
+        rolled = {"lead": team[:, 0], "side1": team[:, 1], "side2": team[:, 2]}
+        return rolled, {"lead": int(fail_lead.sum()), "side1": int(fail_s1.sum()), "side2": int(fail_s2.sum())}
+
+    c = cur.T
+    last, older = hist[:, :, 0].T, hist[:, :, 1:]
+    slot = MODES.index(mode) - 1
+    others = [c[i] for i in range(3) if i != slot]
+    ids = draw_avoiding(rng, leads if mode == "lead" else side_pool,
+                        np.stack([last[slot]] + others, axis=1), older[:, slot])
+    ok = ids != NONE
+    cur[ok, slot] = ids[ok]
+    _push(hist, ok, slot, ids[ok])
+    return {mode: ids[ok]}, {mode: int((~ok).sum())}
+
+
+# ========= STATS =========
+def chi_square_p(x, df):
+    """Upper-tail p-value of chi-square(df) via the Wilson-Hilferty approximation."""
+    if df <= 0:
+        return 1.0
+    h = 2.0 / (9 * df)
+    z = ((x / df) ** (1 / 3) - (1 - h)) / math.sqrt(h)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def two_sample_p(a, b):
+    """p-value that count vectors `a` and `b` come from the same distribution (chi-square homogeneity)."""
+    na, nb = int(a.sum()), int(b.sum())
+    seen = (a + b) > 0
+    if not na or not nb or seen.sum() < 2:
+        return 1.0
+    a, b = a[seen].astype(float), b[seen].astype(float)
+    chi2 = float(((a * math.sqrt(nb / na) - b * math.sqrt(na / nb)) ** 2 / (a + b)).sum())
+    return chi_square_p(chi2, int(seen.sum()) - 1)
+
+
+def slot_report(names, pool, counts):
+    """Frequencies of one slot against the uniform-by-position expectation."""
+    mult = np.bincount(pool, minlength=len(names))
+    in_pool = mult > 0
+    n = int(counts.sum())
+    expected = n * mult / len(pool)
+    obs, exp = counts[in_pool], expected[in_pool]
+    chi2 = float(((obs - exp) ** 2 / exp).sum()) if n else 0.0
+    df = int(in_pool.sum()) - 1
+    ratio = np.where(expected > 0, counts / np.maximum(expected, 1e-12), np.nan)
+    order = sorted(np.flatnonzero(in_pool), key=lambda i: ratio[i])
+    return {
+        "rolls": n,
+        "chi2": chi2,
+        "df": df,
+        "p": chi_square_p(chi2, df) if n else 1.0,
+        "min": (names[order[0]], float(ratio[order[0]])) if n else None,
+        "max": (names[order[-1]], float(ratio[order[-1]])) if n else None,
+        "units": [(names[i], int(mult[i]), int(counts[i]), float(expected[i])) for i in order],
+    }
+
+
+# ========= SIMULATION =========
+def reference_counts(rec, mode, rolls, users, sampler, depth, index):
+    """
+    Replay `rolls` commands of `mode` one user at a time through Sampler with
+    main.py's exclusion rules. Returns {slot: counts}, `index` mapping unit
+    id -> position in the count arrays.
+    """
+    slots = ("lead", "side1", "side2") if mode == "team" else (mode,)
+    counts = {s: np.zeros(len(index), dtype=np.int64) for s in slots}
+    teams = [TeamRecord(u, "", "") for u in range(users)]
+    hists = [{s: () for s in ("lead", "side1", "side2")} for _ in range(users)]
+
+    def team_roll(u):
+        lead, side1, side2, failed = sampler.draw_team(rec.leads, rec.side_pool, hists[u], teams[u])
+        if failed:
+            return None
+        teams[u] = TeamRecord(u, "", "", lead, side1, side2)
+        for s, x in zip(("lead", "side1", "side2"), (lead, side1, side2)):
+            hists[u][s] = ((x,) + hists[u][s])[:depth]
+        return {"lead": lead, "side1": side1, "side2": side2}
+
+    if mode != "team":
+        for u in range(users):
+            team_roll(u)  # single-slot rerolls start from a rolled team
+    for k in range(rolls):
+        u = k % users
+        if mode == "team":
+            rolled = team_roll(u) or {}
+        else:
+            t, recent = teams[u], hists[u][mode]
+            cur = {"lead": t.lead, "side1": t.side1, "side2": t.side2}
+            others = [v for s, v in cur.items() if s != mode]
+            x = sampler.pick(rec.leads if mode == "lead" else rec.side_pool, (*recent[:1], *others), recent[1:])
+            rolled = {mode: x} if x else {}
+            if x:
+                cur[mode] = x
+                teams[u] = TeamRecord(u, "", "", cur["lead"], cur["side1"], cur["side2"])
+                hists[u][mode] = ((x,) + recent)[:depth]
+        for s, x in rolled.items():
+            counts[s][index[x]] += 1
+    return counts
+
+
+def simulate_phase(rec, mode, rolls, users, rng, depth: int = 1, ref_rolls: int = 0, ref_seed=None):
+    """
+    Run `rolls` commands of `mode` for one PhaseUnits; returns {slot: report}.
+    With ref_rolls, each report's "p_ref" compares it against reference_counts()
+    (same rolls per user); otherwise "p_ref" is None.
+    """
+    # Dense per-phase ids so counts can be bincounted; report by name.
+    local = sorted(set(rec.leads) | set(rec.side_pool), key=unit_ids.name)
+    names = [unit_ids.name(u) for u in local]
+    ids = {u: i for i, u in enumerate(local)}
+    leads = np.array([ids[u] for u in rec.leads], dtype=np.int64)
+    side_pool = np.array([ids[u] for u in rec.side_pool], dtype=np.int64)
+    slots = ("lead", "side1", "side2") if mode == "team" else (mode,)
+    counts = {s: np.zeros(len(names), dtype=np.int64) for s in slots}
+    failures = {s: 0 for s in slots}
+
+    users = max(1, min(users, rolls))
+    cur = np.full((users, 3), NONE, dtype=np.int64)
+    hist = np.full((users, 3, max(1, depth)), NONE, dtype=np.int64)
+    if mode != "team" and len(leads) and len(side_pool):
+        roll(rng, "team", leads, side_pool, cur, hist)  # single-slot rerolls start from a rolled team
+
+    done = 0
+    while done < rolls:
+        k = min(users, rolls - done)
+        rolled, failed = roll(rng, mode, leads, side_pool, cur[:k], hist[:k])
+        for s in slots:
+            counts[s] += np.bincount(rolled[s], minlength=len(names))
+            failures[s] += failed[s]
+        done += k
+
+    ref = None
+    if ref_rolls > 0:
+        ref_users = max(1, min(ref_rolls, round(ref_rolls * users / rolls)))
+        ref = reference_counts(rec, mode, ref_rolls, ref_users, Sampler(ref_seed), max(1, depth), ids)
+
+    reports = {}
+    for s in slots:
+        reports[s] = slot_report(names, leads if s == "lead" else side_pool, counts[s])
+        reports[s]["failures"] = failures[s]
+        reports[s]["p_ref"] = two_sample_p(counts[s], ref[s]) if ref else None
+    return reports
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--units-file", default="units.csv")
+    p.add_argument("--phase", help="only this phase (default: every phase)")
+    p.add_argument("--mode", choices=MODES, default="team", help="which reroll command to replay")
+    p.add_argument("--rolls", type=int, default=250_000, help="commands per phase")
+    p.add_argument("--users", type=int, default=20_000, help="simulated users rolling side by side")
+    p.add_argument("--depth", type=int, default=1, help="no-repeat history depth (ROLL_HISTORY_DEPTH)")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--ref-rolls", type=int, default=20_000,
+                   help="commands per phase in the one-at-a-time reference run (0: skip it)")
+    p.add_argument("--alpha", type=float, default=0.001, help="flag slots whose p-value against the reference is below this")
+    p.add_argument("--units", action="store_true", help="print per-unit frequencies")
+    p.add_argument("--csv", help="write per-unit frequencies to this CSV file")
+    args = p.parse_args()
+
+    if np is None:
+        raise SystemExit("simulate.py needs numpy: pip install numpy")
+
+    catalog = UnitCatalog(args.units_file)
+    keys = catalog.phase_keys()
+    if args.phase:
+        rec = catalog.get(args.phase)
+        if rec is None:
+            raise SystemExit(f"unknown phase: {args.phase}")
+        keys = [args.phase.lower()]
+    rng = np.random.default_rng(args.seed)
+
+    header = (f"{'phase':22} {'slot':5} {'rolls':>9} {'fail':>7} {'p unif':>8} {'p ref':>8}  "
+              "least picked (obs/exp)            most picked (obs/exp)")
+    print(header)
+    print("-" * len(header))
+    out_rows = []
+    flagged = 0
+    t0 = time.perf_counter()
+    for key in keys:
+        rec = catalog.get(key)
+        reports = simulate_phase(rec, args.mode, args.rolls, args.users, rng, args.depth,
+                                 args.ref_rolls, None if args.seed is None else args.seed + 1)
+        for slot, r in reports.items():
+            bad = (r["p_ref"] is not None and r["p_ref"] < args.alpha) or r["failures"]
+            p_ref = "-" if r["p_ref"] is None else f"{r['p_ref']:8.1e}"
+            flagged += bool(bad)
+            lo = f"{r['min'][0][:26]} {r['min'][1]:.3f}" if r["min"] else "-"
+            hi = f"{r['max'][0][:26]} {r['max'][1]:.3f}" if r["max"] else "-"
+            print(f"{rec.name[:22]:22} {slot:5} {r['rolls']:>9} {r['failures']:>7} {r['p']:8.1e} "
+                  f"{p_ref:>8}{' *' if bad else '  '}{lo:34} {hi}")
+            for name, mult, count, expected in r["units"]:
+                out_rows.append([rec.name, slot, name, mult, count, round(expected, 1),
+                                 round(count / expected, 4) if expected else ""])
+                if args.units:
+                    print(f"    {name[:40]:40} x{mult}  {count:>9}  expected {expected:>11.1f}  ({count / expected if expected else 0:.3f})")
+    took = time.perf_counter() - t0
+
+    print(f"\n{len(keys)} phase(s), {args.rolls * len(keys):,} {args.mode} rolls in {took:.2f}s; "
+          f"{flagged} slot(s) flagged (* = differs from the reference run at p < {args.alpha}, or exhausted pool)")
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["phase", "slot", "unit", "pool_copies", "picked", "expected", "ratio"])
+            w.writerows(out_rows)
+
+
+if __name__ == "__main__":
+    main()
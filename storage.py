@@ -0,0 +1,610 @@
+import csv, os, json, sqlite3, sys
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from metrics import add_io_bytes
+from records import EMPTY_TEAM, ScoreRecord, TeamRecord, unit_ids
+
+SCORE_FIELDS = ["user_id", "username", "week_start", "phase1", "phase2", "total"]
+TEAM_FIELDS = ["user_id", "username", "phase", "lead", "side1", "side2", "updated_at"]
+PHASE_SLOTS = ("phase1", "phase2")
+
+
+# ========= BACKEND INTERFACE =========
+class StorageBackend(ABC):
+    """
+    Persistence for scores, current teams and the weekly phases map.
+    Score rows are ScoreRecords; teams are TeamRecords holding unit IDs
+    (records.unit_ids), which backends turn back into names on write.
+
+    The backend itself is the hot store. With an `archive` (a WeekArchive)
+    attached, archive_weeks() moves closed weeks out of it, and
+    all_scores()/export_scores() read both, the hot rows winning.
+    """
+    name = "base"
+    archive = None
+
+    @abstractmethod
+    def get_score(self, user_id: int, week_start: str):
+        ...
+
+    @abstractmethod
+    def save_phase_score(self, user_id: int, username: str, week_start: str, slot: str, value: int):
+        """Set one phase slot for (user, week), creating the row if needed. Returns the row."""
+
+    @abstractmethod
+    def week_scores(self, week_start: str):
+        ...
+
+    @abstractmethod
+    def bulk_upsert_scores(self, week_start: str, entries):
+        """
+        Apply many (user_id, username, phase1, phase2) entries to one week in a
+        single write/transaction. None leaves that field unchanged. Returns the
+        resulting rows.
+        """
+
+    @abstractmethod
+    def iter_scores(self, week_start: str = None, since: str = None):
+        """Score rows, streamed; optionally one week or every week >= since."""
+
+    def iter_all_scores(self, week_start: str = None, since: str = None):
+        """iter_scores() plus archived weeks."""
+        if self.archive is None:
+            yield from self.iter_scores(week_start, since)
+            return
+        hot = set(self.hot_weeks())
+        for w in self.archive.weeks():
+            if (week_start and w != week_start) or (since and w < since):
+                continue
+            rows = {r.user_id: r for r in self.archive.read_week(w)}
+            if w in hot:
+                rows.update((r.user_id, r) for r in self.iter_scores(w))
+            yield from rows.values()
+        archived = set(self.archive.weeks())
+        for r in self.iter_scores(week_start, since):
+            if r.week_start not in archived:
+                yield r
+
+    def all_scores(self):
+        return list(self.iter_all_scores())
+
+    def export_scores(self, path: str, week_start: str = None, since: str = None):
+        """Stream matching score rows into a CSV file; returns the row count."""
+        n = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(SCORE_FIELDS)
+            for r in self.iter_all_scores(week_start, since):
+                writer.writerow(r.as_row())
+                n += 1
+        return n
+
+    @abstractmethod
+    def hot_weeks(self):
+        """week_start of every week with rows in the hot store."""
+
+    @abstractmethod
+    def remove_weeks(self, weeks):
+        ...
+
+    def archive_weeks(self, before: str):
+        """Move every hot week older than `before` into the archive; returns those weeks."""
+        if self.archive is None:
+            return []
+        weeks = [w for w in self.hot_weeks() if w < before]
+        for w in weeks:
+            self.archive.write_week(w, list(self.iter_scores(w)))
+        # Only drop them from the hot store once the archive files are durable.
+        if weeks:
+            self.remove_weeks(weeks)
+        return weeks
+
+    def _fill_from_archive(self, week_start, entries):
+        """For bulk upserts into an archived week: None means "keep the archived value"."""
+        if self.archive is None or week_start not in self.archive.weeks():
+            return entries
+        archived = {r.user_id: r for r in self.archive.read_week(week_start)}
+        out = []
+        for user_id, username, p1, p2 in entries:
+            a = archived.get(int(user_id))
+            if a and self.get_score(user_id, week_start) is None:
+                username = username or a.username
+                p1 = a.phase1 if p1 is None else p1
+                p2 = a.phase2 if p2 is None else p2
+            out.append((user_id, username, p1, p2))
+        return out
+
+    @abstractmethod
+    def load_team(self, user_id: int, phase_name: str):
+        """The user's TeamRecord for a phase (EMPTY_TEAM if none). Do not mutate it."""
+
+    @abstractmethod
+    def save_team(self, user_id: int, username: str, phase_name: str, lead, side1, side2):
+        """lead/side1/side2 are unit IDs, 0 for an empty slot."""
+
+    def load_teams(self, user_ids, phase_name: str):
+        """load_team() for many users, in order."""
+        return [self.load_team(u, phase_name) for u in user_ids]
+
+    @abstractmethod
+    def save_teams(self, phase_name: str, entries):
+        """
+        Save many (user_id, username, lead, side1, side2) teams for one phase in
+        a single write/transaction.
+        """
+
+    @abstractmethod
+    def clear_teams(self, keep_phases=()):
+        """Drop saved teams except those of `keep_phases` (lowercase names); returns how many."""
+
+    @abstractmethod
+    def load_phases(self):
+        ...
+
+    @abstractmethod
+    def save_phases(self, phases_map: dict):
+        ...
+
+    def set_week_phases(self, week_start: str, phase1: str, phase2: str):
+        mp = self.load_phases()
+        mp[week_start] = {"phase1": phase1, "phase2": phase2}
+        self.save_phases(mp)
+
+    def lock_key(self, kind: str):
+        """Name of the file a given kind ("scores", "teams", "phases") lives in."""
+        return kind
+
+    def pending(self):
+        """Kinds with changes not yet on disk (write-behind backends)."""
+        return ()
+
+    def flush(self, kind: str = None):
+        """Write buffered changes for one kind, or all of them, to disk."""
+        pass
+
+    def close(self):
+        pass
+
+
+# ========= ATOMIC WRITES =========
+def atomic_write(path: str, write, op: str = None, newline=None, binary: bool = False):
+    """
+    Write a file via `write(f)` into a temp file in the same directory, fsync
+    it, then rename it over `path`. Readers (and a crash) see either the old
+    file or the new one, never a half-written one.
+    """
+    tmp = f"{path}.tmp"
+    with (open(tmp, "wb") if binary else open(tmp, "w", newline=newline, encoding="utf-8")) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+        if op:
+            add_io_bytes(op, written=f.tell())
+    os.replace(tmp, path)
+    try:  # persist the rename itself
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# ========= CSV BACKEND =========
+class CsvStorage(StorageBackend):
+    """
+    The original flat-file layout: scores.csv, current_teams.csv, phases.json.
+
+    Each file is read once into memory and changes are applied there. With
+    write_behind, changed files are only marked dirty and written by flush()
+    (on an interval, and on close), so a burst of commands costs one rewrite;
+    otherwise every change is flushed right away. Flushes are atomic.
+    """
+    name = "csv"
+
+    def __init__(self, scores_file: str, teams_file: str, phases_file: str, write_behind: bool = False):
+        self.scores_file = scores_file
+        self.teams_file = teams_file
+        self.phases_file = phases_file
+        self.write_behind = write_behind
+        self._scores = None   # {(user_id, week_start): ScoreRecord}, file order
+        self._teams = None    # {(user_id, phase_key): TeamRecord}
+        self._phases = None   # week_start -> {"phase1": ..., "phase2": ...}
+        self._dirty = set()
+
+    def lock_key(self, kind):
+        return {"scores": self.scores_file, "teams": self.teams_file, "phases": self.phases_file}[kind]
+
+    # ----- in-memory model -----
+    def _read_csv(self, path, op):
+        if not os.path.exists(path):
+            return []
+        with open(path, newline="", encoding="utf-8") as f:
+            add_io_bytes(op, read=os.fstat(f.fileno()).st_size)
+            return list(csv.DictReader(f))
+
+    def _score_model(self):
+        if self._scores is None:
+            scores = {}
+            for row in self._read_csv(self.scores_file, "load_scores"):
+                r = ScoreRecord(row["user_id"], row["username"], row["week_start"], row.get("phase1"), row.get("phase2"))
+                scores.setdefault((r.user_id, r.week_start), r)
+            self._scores = scores
+        return self._scores
+
+    def _team_model(self):
+        if self._teams is None:
+            teams = {}
+            for row in self._read_csv(self.teams_file, "load_teams"):
+                t = TeamRecord.from_names(row["user_id"], row["username"], row["phase"], row["lead"], row["side1"],
+                                          row["side2"], row.get("updated_at") or "")
+                teams.setdefault((t.user_id, t.phase.lower()), t)
+            self._teams = teams
+        return self._teams
+
+    def _phase_model(self):
+        if self._phases is None:
+            self._phases = {}
+            if os.path.exists(self.phases_file):
+                try:
+                    with open(self.phases_file, "r", encoding="utf-8") as f:
+                        add_io_bytes("load_phases", read=os.fstat(f.fileno()).st_size)
+                        self._phases = json.load(f)
+                except Exception:
+                    self._phases = {}
+        return self._phases
+
+    def _changed(self, kind):
+        self._dirty.add(kind)
+        if not self.write_behind:
+            self.flush(kind)
+
+    def pending(self):
+        return tuple(self._dirty)
+
+    def flush(self, kind=None):
+        for k in ([kind] if kind else list(self._dirty)):
+            if k not in self._dirty:
+                continue
+            if k == "scores":
+                rows = [r.as_row() for r in self._scores.values()]
+                atomic_write(self.scores_file, lambda f: _write_csv(f, SCORE_FIELDS, rows), "flush", newline="")
+            elif k == "teams":
+                rows = [t.as_row() for t in self._teams.values()]
+                atomic_write(self.teams_file, lambda f: _write_csv(f, TEAM_FIELDS, rows), "flush", newline="")
+            elif k == "phases":
+                data = self._phases
+                atomic_write(self.phases_file, lambda f: json.dump(data, f, ensure_ascii=False, indent=2), "flush")
+            # Only clear after a successful write so a failed flush is retried.
+            self._dirty.discard(k)
+
+    # ----- scores -----
+    def get_score(self, user_id, week_start):
+        return self._score_model().get((int(user_id), week_start))
+
+    def save_phase_score(self, user_id, username, week_start, slot, value):
+        if slot not in PHASE_SLOTS:
+            raise ValueError(f"unknown phase slot: {slot}")
+        scores = self._score_model()
+        old = scores.get((int(user_id), week_start))
+        p1, p2 = (old.phase1, old.phase2) if old else (0, 0)
+        p1, p2 = (value, p2) if slot == "phase1" else (p1, value)
+        # Rows handed out are never mutated (rankings key on them); replace instead.
+        result = scores[(int(user_id), week_start)] = ScoreRecord(user_id, username, week_start, p1, p2)
+        self._changed("scores")
+        return result
+
+    def bulk_upsert_scores(self, week_start, entries):
+        entries = self._fill_from_archive(week_start, entries)
+        scores = self._score_model()
+        results = {}
+        for user_id, username, p1, p2 in entries:
+            old = scores.get((int(user_id), week_start))
+            result = scores[(int(user_id), week_start)] = ScoreRecord(
+                user_id, username or (old.username if old else str(user_id)), week_start,
+                (old.phase1 if old else 0) if p1 is None else p1,
+                (old.phase2 if old else 0) if p2 is None else p2)
+            results[result.user_id] = result
+        self._changed("scores")
+        return list(results.values())
+
+    def week_scores(self, week_start):
+        return [r for r in self._score_model().values() if r.week_start == week_start]
+
+    def iter_scores(self, week_start=None, since=None):
+        for r in list(self._score_model().values()):
+            if week_start and r.week_start != week_start:
+                continue
+            if since and r.week_start < since:
+                continue
+            yield r
+
+    def hot_weeks(self):
+        return sorted({w for _, w in self._score_model()})
+
+    def remove_weeks(self, weeks):
+        weeks = set(weeks)
+        scores = self._score_model()
+        for key in [k for k in scores if k[1] in weeks]:
+            del scores[key]
+        self._changed("scores")
+
+    # ----- teams -----
+    def load_team(self, user_id, phase_name):
+        return self._team_model().get((int(user_id), phase_name.lower()), EMPTY_TEAM)
+
+    def save_team(self, user_id, username, phase_name, lead, side1, side2):
+        teams = self._team_model()
+        key = (int(user_id), phase_name.lower())
+        old = teams.get(key)
+        teams[key] = TeamRecord(user_id, username, old.phase if old else phase_name, lead or 0, side1 or 0, side2 or 0,
+                                datetime.utcnow().isoformat())
+        self._changed("teams")
+
+    def save_teams(self, phase_name, entries):
+        teams = self._team_model()
+        now = datetime.utcnow().isoformat()
+        for user_id, username, lead, side1, side2 in entries:
+            key = (int(user_id), phase_name.lower())
+            old = teams.get(key)
+            teams[key] = TeamRecord(user_id, username, old.phase if old else phase_name, lead or 0, side1 or 0,
+                                    side2 or 0, now)
+        self._changed("teams")
+
+    def clear_teams(self, keep_phases=()):
+        teams = self._team_model()
+        drop = [k for k in teams if k[1] not in keep_phases]
+        for key in drop:
+            del teams[key]
+        if drop:
+            self._changed("teams")
+        return len(drop)
+
+    # ----- phases -----
+    def load_phases(self):
+        return {w: dict(e) for w, e in self._phase_model().items()}
+
+    def save_phases(self, phases_map):
+        self._phases = {w: dict(e) for w, e in phases_map.items()}
+        self._changed("phases")
+
+    def set_week_phases(self, week_start, phase1, phase2):
+        self._phase_model()[week_start] = {"phase1": phase1, "phase2": phase2}
+        self._changed("phases")
+
+    def close(self):
+        self.flush()
+
+
+def _write_csv(f, fields, rows):
+    writer = csv.writer(f)
+    writer.writerow(fields)
+    writer.writerows(rows)
+
+
+# ========= SQLITE BACKEND =========
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    user_id    INTEGER NOT NULL,
+    username   TEXT NOT NULL,
+    week_start TEXT NOT NULL,
+    phase1     INTEGER NOT NULL DEFAULT 0,
+    phase2     INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, week_start)
+);
+CREATE INDEX IF NOT EXISTS scores_week ON scores (week_start);
+CREATE TABLE IF NOT EXISTS teams (
+    user_id    INTEGER NOT NULL,
+    phase_key  TEXT NOT NULL,
+    username   TEXT NOT NULL,
+    phase      TEXT NOT NULL,
+    lead       TEXT,
+    side1      TEXT,
+    side2      TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, phase_key)
+);
+CREATE TABLE IF NOT EXISTS phases (
+    week_start TEXT PRIMARY KEY,
+    phase1     TEXT,
+    phase2     TEXT
+);
+"""
+UPSERT_SCORE = (
+    "INSERT INTO scores (user_id, username, week_start, phase1, phase2) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, week_start) DO UPDATE SET username = excluded.username, "
+    "phase1 = excluded.phase1, phase2 = excluded.phase2")
+BULK_UPSERT_SCORE = (  # NULL score/username keeps the stored value
+    "INSERT INTO scores (user_id, username, week_start, phase1, phase2) "
+    "VALUES (:uid, COALESCE(:name, CAST(:uid AS TEXT)), :week, COALESCE(:p1, 0), COALESCE(:p2, 0)) "
+    "ON CONFLICT (user_id, week_start) DO UPDATE SET username = COALESCE(:name, username), "
+    "phase1 = COALESCE(:p1, phase1), phase2 = COALESCE(:p2, phase2)")
+UPSERT_TEAM = (
+    "INSERT INTO teams (user_id, phase_key, username, phase, lead, side1, side2, updated_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, phase_key) DO UPDATE SET username = excluded.username, "
+    "lead = excluded.lead, side1 = excluded.side1, side2 = excluded.side2, updated_at = excluded.updated_at")
+UPSERT_PHASES = (
+    "INSERT INTO phases (week_start, phase1, phase2) VALUES (?, ?, ?) "
+    "ON CONFLICT (week_start) DO UPDATE SET phase1 = excluded.phase1, phase2 = excluded.phase2")
+
+
+class SqliteStorage(StorageBackend):
+    """
+    Embedded SQLite store (WAL mode). Scores are keyed on (user_id, week_start)
+    and teams on (user_id, phase), so every write is a single keyed upsert.
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        # Calls arrive from the I/O executor threads, serialized by DataAccess.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def lock_key(self, kind):
+        # One connection for every table: serialize on the database file.
+        return self.path
+
+    def get_score(self, user_id, week_start):
+        cur = self.conn.execute(
+            "SELECT user_id, username, week_start, phase1, phase2 FROM scores WHERE user_id = ? AND week_start = ?",
+            (user_id, week_start))
+        row = cur.fetchone()
+        return ScoreRecord(*row) if row else None
+
+    def save_phase_score(self, user_id, username, week_start, slot, value):
+        if slot not in PHASE_SLOTS:
+            raise ValueError(f"unknown phase slot: {slot}")
+        with self.conn:
+            self.conn.execute(
+                f"INSERT INTO scores (user_id, username, week_start, {slot}) VALUES (?, ?, ?, ?) "
+                f"ON CONFLICT (user_id, week_start) DO UPDATE SET username = excluded.username, {slot} = excluded.{slot}",
+                (user_id, username, week_start, value))
+        return self.get_score(user_id, week_start)
+
+    def week_scores(self, week_start):
+        cur = self.conn.execute(
+            "SELECT user_id, username, week_start, phase1, phase2 FROM scores WHERE week_start = ?",
+            (week_start,))
+        return [ScoreRecord(*row) for row in cur]
+
+    def bulk_upsert_scores(self, week_start, entries):
+        entries = self._fill_from_archive(week_start, entries)
+        params = [{"uid": u, "name": name or None, "week": week_start, "p1": p1, "p2": p2} for u, name, p1, p2 in entries]
+        with self.conn:
+            self.conn.executemany(BULK_UPSERT_SCORE, params)
+        users = {p["uid"] for p in params}
+        return [r for r in self.week_scores(week_start) if r.user_id in users]
+
+    def iter_scores(self, week_start=None, since=None):
+        sql = "SELECT user_id, username, week_start, phase1, phase2 FROM scores"
+        if week_start:
+            cur = self.conn.execute(sql + " WHERE week_start = ?", (week_start,))
+        elif since:
+            cur = self.conn.execute(sql + " WHERE week_start >= ?", (since,))
+        else:
+            cur = self.conn.execute(sql)
+        for row in cur:
+            yield ScoreRecord(*row)
+
+    def hot_weeks(self):
+        return [w for (w,) in self.conn.execute("SELECT DISTINCT week_start FROM scores ORDER BY week_start")]
+
+    def remove_weeks(self, weeks):
+        with self.conn:
+            self.conn.executemany("DELETE FROM scores WHERE week_start = ?", [(w,) for w in weeks])
+
+    def load_team(self, user_id, phase_name):
+        cur = self.conn.execute(
+            "SELECT user_id, username, phase, lead, side1, side2, updated_at FROM teams WHERE user_id = ? AND phase_key = ?",
+            (user_id, phase_name.lower()))
+        row = cur.fetchone()
+        return TeamRecord.from_names(*row) if row else EMPTY_TEAM
+
+    def save_team(self, user_id, username, phase_name, lead, side1, side2):
+        with self.conn:
+            self.conn.execute(
+                UPSERT_TEAM,
+                (user_id, phase_name.lower(), username, phase_name, unit_ids.name(lead or 0) or "",
+                 unit_ids.name(side1 or 0) or "", unit_ids.name(side2 or 0) or "", datetime.utcnow().isoformat()))
+
+    def save_teams(self, phase_name, entries):
+        name, now = unit_ids.name, datetime.utcnow().isoformat()
+        with self.conn:
+            self.conn.executemany(
+                UPSERT_TEAM,
+                [(user_id, phase_name.lower(), username, phase_name, name(lead or 0) or "", name(side1 or 0) or "",
+                  name(side2 or 0) or "", now) for user_id, username, lead, side1, side2 in entries])
+
+    def clear_teams(self, keep_phases=()):
+        keep = sorted(keep_phases)
+        with self.conn:
+            cur = self.conn.execute(
+                f"DELETE FROM teams WHERE phase_key NOT IN ({', '.join('?' * len(keep))})" if keep else "DELETE FROM teams",
+                keep)
+        return cur.rowcount
+
+    def load_phases(self):
+        cur = self.conn.execute("SELECT week_start, phase1, phase2 FROM phases")
+        return {w: {"phase1": p1, "phase2": p2} for w, p1, p2 in cur}
+
+    def save_phases(self, phases_map):
+        with self.conn:
+            self.conn.execute("DELETE FROM phases")
+            self.conn.executemany(
+                UPSERT_PHASES,
+                [(w, e.get("phase1"), e.get("phase2")) for w, e in phases_map.items()])
+
+    def set_week_phases(self, week_start, phase1, phase2):
+        with self.conn:
+            self.conn.execute(
+                UPSERT_PHASES,
+                (week_start, phase1, phase2))
+
+    def close(self):
+        self.conn.close()
+
+
+# ========= FACTORY / MIGRATION =========
+def open_storage(backend: str, scores_file: str, teams_file: str, phases_file: str, sqlite_file: str,
+                 write_behind: bool = False, archive=None):
+    backend = (backend or "csv").lower()
+    if backend == "csv":
+        store = CsvStorage(scores_file, teams_file, phases_file, write_behind)
+    elif backend == "sqlite":
+        store = SqliteStorage(sqlite_file)
+    else:
+        raise ValueError(f"unknown storage backend: {backend}")
+    store.archive = archive
+    return store
+
+
+def migrate_csv_to_sqlite(scores_file: str, teams_file: str, phases_file: str, sqlite_file: str):
+    """
+    One-shot copy of the CSV/JSON files into a SQLite database.
+    Safe to re-run: rows are upserted on their keys. Returns per-table counts.
+    """
+    src = CsvStorage(scores_file, teams_file, phases_file)
+    dst = SqliteStorage(sqlite_file)
+    counts = {"scores": 0, "teams": 0, "phases": 0}
+    try:
+        with dst.conn:
+            if os.path.exists(scores_file):
+                with open(scores_file, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        r = ScoreRecord(row["user_id"], row["username"], row["week_start"], row.get("phase1"), row.get("phase2"))
+                        dst.conn.execute(UPSERT_SCORE, r.as_row()[:5])
+                        counts["scores"] += 1
+            if os.path.exists(teams_file):
+                with open(teams_file, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        dst.conn.execute(
+                            UPSERT_TEAM,
+                            (int(row["user_id"]), row["phase"].lower(), row["username"], row["phase"],
+                             row["lead"], row["side1"], row["side2"], row.get("updated_at") or ""))
+                        counts["teams"] += 1
+            for week_start, entry in src.load_phases().items():
+                dst.conn.execute(
+                    UPSERT_PHASES,
+                    (week_start, entry.get("phase1"), entry.get("phase2")))
+                counts["phases"] += 1
+    finally:
+        dst.close()
+    return counts
+
+
+if __name__ == "__main__":
+    # python storage.py migrate [scores.csv current_teams.csv phases.json gq.sqlite3]
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        raise SystemExit("Usage: python storage.py migrate [scores.csv current_teams.csv phases.json gq.sqlite3]")
+    paths = sys.argv[2:6] or ["scores.csv", "current_teams.csv", "phases.json", "gq.sqlite3"]
+    if len(paths) != 4:
+        raise SystemExit("Provide all four paths or none.")
+    print(migrate_csv_to_sqlite(*paths))
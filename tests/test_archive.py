@@ -0,0 +1,45 @@
+from archive import WeekArchive
+from records import ScoreRecord
+
+WEEK = "2025-07-07"
+
+
+def rows(*entries):
+    return [ScoreRecord(uid, name, WEEK, p1, p2) for uid, name, p1, p2 in entries]
+
+
+def as_tuples(records):
+    return [r.as_row() for r in records]
+
+
+def test_write_read_round_trip(tmp_path):
+    archive = WeekArchive(str(tmp_path / "archive"))
+    n = archive.write_week(WEEK, rows((3, "c", 1, 2), (1, "a ü", 10**12, 0), (2, "b", 0, 7)))
+    assert n == 3
+    assert archive.weeks() == [WEEK]
+    assert as_tuples(archive.read_week(WEEK)) == [
+        (1, "a ü", WEEK, 10**12, 0, 10**12),
+        (2, "b", WEEK, 0, 7, 7),
+        (3, "c", WEEK, 1, 2, 3),
+    ]
+    with archive.open_week(WEEK) as wk:
+        assert list(wk.user_ids) == [1, 2, 3]
+        assert list(wk.phase2) == [0, 7, 2]
+
+
+def test_rewrite_merges_new_rows_over_archived(tmp_path):
+    archive = WeekArchive(str(tmp_path))
+    archive.write_week(WEEK, rows((1, "a", 5, 5), (2, "b", 1, 1)))
+    archive.write_week(WEEK, rows((2, "b2", 9, 0), (4, "d", 0, 3)))
+    assert as_tuples(archive.read_week(WEEK)) == [
+        (1, "a", WEEK, 5, 5, 10),
+        (2, "b2", WEEK, 9, 0, 9),
+        (4, "d", WEEK, 0, 3, 3),
+    ]
+
+
+def test_missing_and_empty_weeks(tmp_path):
+    archive = WeekArchive(str(tmp_path / "none"))
+    assert archive.weeks() == [] and archive.read_week(WEEK) == []
+    archive.write_week(WEEK, [])
+    assert archive.read_week(WEEK) == []
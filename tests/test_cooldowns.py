@@ -0,0 +1,82 @@
+import time
+
+from cooldowns import CooldownStore, load_snapshot, save_snapshot
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cooldown_expires():
+    clock = Clock()
+    cd = CooldownStore({"team": 300}, clock=clock)
+    assert cd.check(1, "team") == 0
+    clock.now += 61
+    assert cd.check(1, "team") == 4          # 239s left, rounded up to minutes
+    assert cd.check(2, "team") == 0          # per user
+    clock.now += 240
+    assert cd.check(1, "team") == 0
+    assert len(cd) == 2
+
+
+def test_expired_entries_are_purged():
+    clock = Clock()
+    cd = CooldownStore({"team": 10}, clock=clock)
+    for u in range(5):
+        cd.check(u, "team")
+    clock.now += 11
+    cd.check(99, "team")
+    assert len(cd) == 1
+
+
+def test_cap_evicts_closest_to_expiring():
+    clock = Clock()
+    cd = CooldownStore({"team": 100}, max_entries=3, clock=clock)
+    for u in range(5):
+        cd.check(u, "team")
+        clock.now += 1
+    assert len(cd) == 3
+    assert cd.check(0, "team") == 0          # evicted, so free again
+    assert cd.check(4, "team") > 0           # newest kept
+
+
+def test_snapshot_restore_keeps_remaining_time():
+    clock = Clock()
+    cd = CooldownStore({"team": 300, "lead": 300}, clock=clock)
+    cd.check(1, "team")
+    clock.now += 100
+    snap = cd.snapshot()
+    snap["saved_at"] = time.time() - 50      # restart took 50s
+
+    restored = CooldownStore({"team": 300}, clock=Clock())
+    restored.restore(snap)
+    assert restored.check(1, "team") == 3    # 150s left
+    assert len(restored) == 1
+
+
+def test_restore_drops_unknown_buckets_and_expired():
+    cd = CooldownStore({"team": 300}, clock=Clock())
+    cd.restore({"saved_at": time.time() - 100, "entries": [["team", 1, 50], ["gone", 2, 200], ["team", 3, 200]]})
+    assert cd.check(1, "team") == 0
+    assert cd.check(3, "team") == 2
+
+
+def test_snapshot_file_round_trip(tmp_path):
+    path = str(tmp_path / "cooldowns.json")
+    assert load_snapshot(path) is None
+    cd = CooldownStore({"team": 300}, clock=Clock())
+    cd.check(1, "team")
+    save_snapshot(path, cd.snapshot())
+    restored = CooldownStore({"team": 300}, clock=Clock())
+    restored.restore(load_snapshot(path))
+    assert restored.check(1, "team") > 0
+
+
+def test_corrupt_snapshot_file_is_ignored(tmp_path):
+    path = tmp_path / "cooldowns.json"
+    path.write_text("{not json")
+    assert load_snapshot(str(path)) is None
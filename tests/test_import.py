@@ -0,0 +1,26 @@
+import io
+
+import pytest
+
+main = pytest.importorskip("main")
+
+
+def parse(text):
+    return main.parse_score_sheet(io.BytesIO(text.encode("utf-8")))
+
+
+def test_rows_and_errors():
+    entries, errors = parse("﻿user_id,username,phase1,phase2\n1,a,\"1,000\",\nx,b,1,2\n2,,,\n\n3,c,5,abc\n")
+    assert entries == [(1, "a", 1000, None)]
+    assert errors == [(3, "invalid user_id 'x'"), (4, "no phase1/phase2 score"), (6, "invalid phase2 'abc'")]
+
+
+def test_duplicate_rows_merge_field_by_field():
+    entries, errors = parse("user_id,username,phase1,phase2\n1,a,1000,\n2,b,5,6\n1,,,7\n2,b2,9,\n")
+    assert sorted(entries) == [(1, "a", 1000, 7), (2, "b2", 9, 6)]
+    assert errors == []
+
+
+def test_missing_user_id_column():
+    entries, errors = parse("name,phase1\na,1\n")
+    assert entries == [] and errors[0][0] == 1
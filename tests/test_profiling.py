@@ -0,0 +1,23 @@
+import marshal
+
+from data_access import make_io_executor
+from profiling import CpuProfile
+
+
+def busy_io_work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_cpu_profile_covers_executor_threads():
+    ex = make_io_executor(2)
+    try:
+        prof = CpuProfile(ex)
+        prof.start()
+        assert [f.result() for f in [ex.submit(busy_io_work, 10_000) for _ in range(4)]]
+        text, raw = prof.stop()
+    finally:
+        ex.shutdown()
+    assert "Threads covered: event loop" in text and "gq-io_0" in text
+    assert "busy_io_work" in text
+    assert any(func[2] == "busy_io_work" for func in marshal.loads(raw))
+    assert ex.wrap is None and not prof.active
@@ -0,0 +1,37 @@
+from ranking import Leaderboards, Ranking
+from records import ScoreRecord
+
+WEEK = "2025-07-07"
+
+
+def row(uid, p1, p2=0, week=WEEK):
+    return ScoreRecord(uid, f"user{uid}", week, p1, p2)
+
+
+def test_rank_orders_by_total_then_user_id():
+    r = Ranking([row(1, 10), row(2, 30), row(3, 10), row(4, 20)])
+    assert [x.user_id for x in r.top(10)] == [2, 4, 1, 3]
+    assert r.rank(2) == 1 and r.rank(1) == 3 and r.rank(3) == 4
+    assert r.rank(99) is None
+
+
+def test_update_moves_row_and_keeps_size():
+    r = Ranking([row(1, 10), row(2, 30), row(3, 20)])
+    r.update(row(1, 40))
+    assert r.rank(1) == 1 and r.rank(2) == 2 and r.rank(3) == 3
+    r.update(row(2, 0))
+    assert r.rank(2) == 3
+    assert len(r) == 3
+    r.update(row(5, 25))
+    assert len(r) == 4 and r.rank(5) == 2
+
+
+def test_leaderboards_update_tracks_week_and_season():
+    b = Leaderboards()
+    b.load_all([row(1, 10, week="2025-06-30"), row(2, 5, week="2025-06-30")])
+    b.update(row(2, 20))
+    b.update(row(2, 30))   # same week again: replaces, not adds
+    assert b.week(WEEK).rank(2) == 1
+    season = b.season.row(2)
+    assert (season.total, season.weeks) == (35, 2)
+    assert b.history(2) == [(WEEK, 30), ("2025-06-30", 5)]
@@ -0,0 +1,58 @@
+from records import unit_ids
+from roll_history import RollHistory
+
+
+def test_recent_newest_first_and_wraps():
+    h = RollHistory(capacity=3)
+    for unit in (1, 2, 3, 4, 5):
+        h.push(10, "lead", unit)
+    assert h.recent(10, "lead", 3) == (5, 4, 3)
+    assert h.recent(10, "lead", 10) == (5, 4, 3)   # capped at capacity
+    assert h.recent(10, "lead", 1) == (5,)
+
+
+def test_slots_are_independent_and_partial_rings_stop_at_empty():
+    h = RollHistory(capacity=4)
+    h.record(10, lead=1, side1=2)
+    h.push(10, "side1", 3)
+    assert h.recent(10, "lead", 4) == (1,)
+    assert h.recent(10, "side1", 4) == (3, 2)
+    assert h.recent(10, "side2", 4) == ()
+    assert h.recent(99, "lead", 4) == ()
+
+
+def test_lru_eviction_drops_least_recent_roller():
+    h = RollHistory(capacity=2, max_users=2)
+    h.push(1, "lead", 1)
+    h.push(2, "lead", 2)
+    h.recent(1, "lead", 1)       # touching user 1 keeps it resident
+    h.push(3, "lead", 3)
+    assert len(h) == 2
+    assert h.recent(2, "lead", 1) == ()
+    assert h.recent(1, "lead", 1) == (1,)
+    assert h.recent(3, "lead", 1) == (3,)
+
+
+def test_json_round_trip_after_wrap():
+    a, b, c = (unit_ids.id(n) for n in ("Test Unit A", "Test Unit B", "Test Unit C"))
+    h = RollHistory(capacity=2)
+    for unit in (a, b, c):
+        h.push(5, "side2", unit)
+    data = h.to_json()
+    assert data["users"]["5"]["side2"] == ["Test Unit C", "Test Unit B"]   # saved as names
+    restored = RollHistory(capacity=2)
+    restored.restore(data)
+    assert restored.recent(5, "side2", 2) == (c, b)
+    assert not restored.dirty
+
+
+def test_write_then_load(tmp_path):
+    a = unit_ids.id("Test Unit A")
+    path = str(tmp_path / "roll_history.json")
+    h = RollHistory(capacity=3)
+    h.push(7, "lead", a)
+    RollHistory.write(path, h.to_json())
+    loaded = RollHistory(capacity=3)
+    loaded.load(path)
+    assert loaded.recent(7, "lead", 3) == (a,)
+    RollHistory().load(str(tmp_path / "missing.json"))   # no file: nothing to restore
@@ -0,0 +1,47 @@
+import csv
+
+import pytest
+
+main = pytest.importorskip("main")
+
+WEEK = "2025-07-07"
+
+
+def write_teams(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["user_id", "username", "phase", "lead", "side1", "side2", "updated_at"])
+        w.writerows(rows)
+
+
+@pytest.fixture
+def guild_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "current_week", lambda: (WEEK, "phase2", None, None, None))
+    d = tmp_path / "guilds" / "1"
+    d.mkdir(parents=True)
+    (d / "phases.json").write_text('{"%s": {"phase1": "Old Phase", "phase2": "New Phase"}}' % WEEK)
+    write_teams(d / "current_teams.csv", [
+        [10, "a", "Old Phase", "A", "B", "C", ""],
+        [10, "a", "New Phase", "D", "E", "F", ""],
+    ])
+    return d
+
+
+def teams(d):
+    with open(d / "current_teams.csv", newline="", encoding="utf-8") as f:
+        return [row["phase"] for row in csv.DictReader(f)]
+
+
+def test_open_catches_up_on_missed_reset(guild_dir):
+    gs = main.open_guild(1)
+    gs.dal.storage.flush()
+    assert teams(guild_dir) == ["New Phase"]
+    assert gs.last_rollover == (WEEK, "phase2")
+
+
+def test_open_skips_reset_already_done(guild_dir):
+    (guild_dir / "rollover.json").write_text('["%s", "phase2"]' % WEEK)
+    gs = main.open_guild(1)
+    gs.dal.storage.flush()
+    assert teams(guild_dir) == ["Old Phase", "New Phase"]
@@ -0,0 +1,74 @@
+from records import TeamRecord
+from sampler import Sampler
+
+LEADS = [1, 2, 3, 4]
+SIDES = [5, 6, 7, 8, 9]
+SIDE_POOL = SIDES + LEADS
+
+
+def test_draw_team_three_distinct_from_pools():
+    s = Sampler(seed=1)
+    for _ in range(500):
+        lead, side1, side2, failed = s.draw_team(LEADS, SIDE_POOL, {}, TeamRecord(1, "u", "p"))
+        assert failed is None
+        assert lead in LEADS and side1 in SIDE_POOL and side2 in SIDE_POOL
+        assert len({lead, side1, side2}) == 3
+
+
+def test_draw_team_honours_exclusions():
+    s = Sampler(seed=2)
+    current = TeamRecord(1, "u", "p", lead=1, side1=5, side2=6)
+    recent = {"lead": (2,), "side1": (7,), "side2": (8,)}
+    for _ in range(500):
+        lead, side1, side2, failed = s.draw_team(LEADS, SIDE_POOL, recent, current)
+        assert failed is None
+        assert lead not in (2, 5, 6)            # last lead, the other saved slots
+        assert side1 not in (lead, 7, 1, 6)     # lead, last side1, saved lead/side2
+        assert side2 not in (lead, side1, 8, 1, 5)
+
+
+def test_draw_team_older_history_is_soft():
+    s = Sampler(seed=3)
+    # Older history would exclude every lead; it is dropped rather than failing.
+    lead, *_, failed = s.draw_team([1, 2], SIDE_POOL, {"lead": (1, 2)}, TeamRecord(1, "u", "p"))
+    assert failed is None and lead == 2
+
+
+def test_draw_team_reports_exhausted_slot():
+    s = Sampler(seed=4)
+    lead, side1, side2, failed = s.draw_team([1], [1, 5], {}, TeamRecord(1, "u", "p"))
+    assert (lead, side1, failed) == (1, 5, "side2")
+    assert side2 == 0
+
+
+def test_seed_is_reproducible():
+    a, b = Sampler(seed=7), Sampler(seed=7)
+    team = TeamRecord(1, "u", "p")
+    assert [a.draw_team(LEADS, SIDE_POOL, {}, team) for _ in range(20)] == \
+           [b.draw_team(LEADS, SIDE_POOL, {}, team) for _ in range(20)]
+
+
+def test_string_seed_from_env_is_reproducible():
+    # ROLL_SEED arrives as a string from the environment.
+    a, b = Sampler("0"), Sampler("0")
+    assert [a.pick(SIDE_POOL, (5,), (6,)) for _ in range(50)] == [b.pick(SIDE_POOL, (5,), (6,)) for _ in range(50)]
+
+
+def test_reseed_restarts_both_generators():
+    s = Sampler(seed=11, vector_min=1)
+    team = [TeamRecord(u, "u", "p") for u in range(50)]
+    recent = [{} for _ in team]
+    first = ([s.pick(SIDE_POOL) for _ in range(10)], s.draw_teams(LEADS, SIDE_POOL, recent, team))
+    s.seed(11)
+    assert ([s.pick(SIDE_POOL) for _ in range(10)], s.draw_teams(LEADS, SIDE_POOL, recent, team)) == first
+
+
+def test_draw_teams_batch_matches_rules():
+    s = Sampler(seed=5, vector_min=1)
+    current = [TeamRecord(u, "u", "p", lead=1 + u % 4, side1=5 + u % 5, side2=9 - u % 3) for u in range(200)]
+    recent = [{"lead": (1 + (u + 1) % 4,), "side1": (5 + (u + 2) % 5,), "side2": ()} for u in range(200)]
+    for c, r, (lead, side1, side2, failed) in zip(current, recent, s.draw_teams(LEADS, SIDE_POOL, recent, current)):
+        assert failed is None
+        assert lead in LEADS and lead not in (r["lead"][0], c.side1, c.side2)
+        assert side1 not in (lead, r["side1"][0], c.lead, c.side2)
+        assert side2 not in (lead, side1, c.lead, c.side1)
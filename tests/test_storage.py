@@ -0,0 +1,141 @@
+import pytest
+
+from archive import WeekArchive
+from records import EMPTY_TEAM, unit_ids
+from storage import CsvStorage, SqliteStorage, StorageBackend, migrate_csv_to_sqlite, open_storage
+
+OLD, WEEK = "2025-06-30", "2025-07-07"
+LEAD, SIDE1, SIDE2 = (unit_ids.id(n) for n in ("Storage Lead", "Storage Side 1", "Storage Side 2"))
+
+
+def open_store(backend, d, archive=False):
+    return open_storage(backend, str(d / "scores.csv"), str(d / "teams.csv"), str(d / "phases.json"),
+                        str(d / "gq.sqlite3"), archive=WeekArchive(str(d / "archive")) if archive else None)
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def store(backend, tmp_path):
+    s = open_store(backend, tmp_path, archive=True)
+    yield s
+    s.close()
+
+
+def scores(rows):
+    return sorted(r.as_row() for r in rows)
+
+
+def test_save_phase_score_upserts_one_row(store):
+    store.save_phase_score(1, "a", WEEK, "phase1", 10)
+    row = store.save_phase_score(1, "a2", WEEK, "phase2", 5)
+    assert row.as_row() == (1, "a2", WEEK, 10, 5, 15)
+    assert scores(store.week_scores(WEEK)) == [(1, "a2", WEEK, 10, 5, 15)]
+    assert store.get_score(1, OLD) is None
+    with pytest.raises(ValueError):
+        store.save_phase_score(1, "a", WEEK, "phase3", 1)
+
+
+def test_bulk_upsert_none_keeps_stored_values(store):
+    store.save_phase_score(1, "a", WEEK, "phase1", 10)
+    rows = store.bulk_upsert_scores(WEEK, [(1, None, None, 7), (2, None, 3, None)])
+    assert scores(rows) == [(1, "a", WEEK, 10, 7, 17), (2, "2", WEEK, 3, 0, 3)]
+    assert scores(store.week_scores(WEEK)) == scores(rows)
+
+
+def test_iter_all_scores_merges_archive_and_hot_rows(store):
+    store.bulk_upsert_scores(OLD, [(1, "a", 1, 1), (2, "b", 2, 2)])
+    store.save_phase_score(1, "a", WEEK, "phase1", 9)
+    assert store.archive_weeks(WEEK) == [OLD]
+    assert store.hot_weeks() == [WEEK]
+    # A late correction lands in the hot store and wins over the archived row.
+    store.save_phase_score(2, "b", OLD, "phase1", 50)
+    assert scores(store.iter_all_scores()) == [
+        (1, "a", OLD, 1, 1, 2), (1, "a", WEEK, 9, 0, 9), (2, "b", OLD, 50, 0, 50)]
+    assert scores(store.iter_all_scores(week_start=OLD)) == [(1, "a", OLD, 1, 1, 2), (2, "b", OLD, 50, 0, 50)]
+    assert scores(store.iter_all_scores(since=WEEK)) == [(1, "a", WEEK, 9, 0, 9)]
+
+
+def test_bulk_upsert_into_archived_week_keeps_archived_values(store):
+    store.bulk_upsert_scores(OLD, [(1, "a", 4, 6)])
+    store.archive_weeks(WEEK)
+    rows = store.bulk_upsert_scores(OLD, [(1, None, None, 8)])
+    assert scores(rows) == [(1, "a", OLD, 4, 8, 12)]
+
+
+def test_export_scores(store, tmp_path):
+    store.bulk_upsert_scores(WEEK, [(1, "a", 1, 2), (2, "b", 3, 4)])
+    path = tmp_path / "out.csv"
+    assert store.export_scores(str(path), WEEK) == 2
+    assert path.read_text(encoding="utf-8").splitlines()[0] == "user_id,username,week_start,phase1,phase2,total"
+
+
+def test_teams_keyed_on_user_and_phase(store):
+    store.save_team(1, "a", "Soul Reaper Melee", LEAD, SIDE1, SIDE2)
+    store.save_team(1, "a", "soul reaper melee", LEAD, SIDE2, 0)
+    t = store.load_team(1, "SOUL REAPER MELEE")
+    assert (t.lead, t.side1, t.side2) == (LEAD, SIDE2, 0)
+    assert store.load_team(2, "Soul Reaper Melee") is EMPTY_TEAM
+    store.save_teams("Arrancar Ranged", [(1, "a", SIDE1, SIDE2, LEAD), (2, "b", LEAD, 0, 0)])
+    assert [t.lead for t in store.load_teams([2, 1, 3], "Arrancar Ranged")] == [LEAD, SIDE1, 0]
+
+
+def test_clear_teams_keeps_listed_phases(store):
+    store.save_team(1, "a", "Keep Me", LEAD, SIDE1, SIDE2)
+    store.save_teams("Drop Me", [(1, "a", LEAD, 0, 0), (2, "b", LEAD, 0, 0)])
+    assert store.clear_teams({"keep me"}) == 2
+    assert store.load_team(1, "Keep Me").lead == LEAD
+    assert store.load_team(1, "Drop Me") is EMPTY_TEAM
+    assert store.clear_teams() == 1
+
+
+def test_phases(store):
+    store.set_week_phases(WEEK, "One", "Two")
+    store.set_week_phases(OLD, "A", "B")
+    assert store.load_phases()[WEEK] == {"phase1": "One", "phase2": "Two"}
+    store.save_phases({WEEK: {"phase1": "X", "phase2": "Y"}})
+    assert store.load_phases() == {WEEK: {"phase1": "X", "phase2": "Y"}}
+
+
+def test_data_survives_reopen(backend, tmp_path):
+    s = open_store(backend, tmp_path)
+    s.save_phase_score(1, "a", WEEK, "phase1", 10)
+    s.save_team(1, "a", "P", LEAD, SIDE1, SIDE2)
+    s.set_week_phases(WEEK, "P", "Q")
+    s.close()
+    s = open_store(backend, tmp_path)
+    assert s.get_score(1, WEEK).total == 10
+    assert s.load_team(1, "p").side2 == SIDE2
+    assert s.load_phases() == {WEEK: {"phase1": "P", "phase2": "Q"}}
+    s.close()
+
+
+def test_migrate_csv_to_sqlite(tmp_path):
+    src = CsvStorage(str(tmp_path / "scores.csv"), str(tmp_path / "teams.csv"), str(tmp_path / "phases.json"))
+    src.bulk_upsert_scores(WEEK, [(1, "a", 1, 2), (2, "b", 3, 4)])
+    src.save_team(1, "a", "Soul Reaper Melee", LEAD, SIDE1, 0)
+    src.set_week_phases(WEEK, "Soul Reaper Melee", "Arrancar Ranged")
+    paths = [str(tmp_path / n) for n in ("scores.csv", "teams.csv", "phases.json", "gq.sqlite3")]
+    assert migrate_csv_to_sqlite(*paths) == {"scores": 2, "teams": 1, "phases": 1}
+    assert migrate_csv_to_sqlite(*paths) == {"scores": 2, "teams": 1, "phases": 1}   # re-runnable
+
+    dst = SqliteStorage(paths[3])
+    try:
+        assert scores(dst.iter_scores()) == scores(src.iter_scores())
+        t = dst.load_team(1, "soul reaper melee")
+        assert (t.lead, t.side1, t.side2) == (LEAD, SIDE1, 0)
+        assert dst.load_phases() == src.load_phases()
+    finally:
+        dst.close()
+
+
+def test_incomplete_backend_fails_on_construction():
+    class Partial(StorageBackend):
+        def get_score(self, user_id, week_start):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,103 @@
+import asyncio, csv
+
+import pytest
+
+import storage
+from data_access import DataAccess, make_io_executor
+from storage import CsvStorage
+
+WEEK = "2025-07-07"
+
+
+class Writes(list):
+    """Paths passed to storage.atomic_write, in order; `fail` makes the next N writes raise."""
+    fail = 0
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    calls = Writes()
+    real = storage.atomic_write
+
+    def recording(path, *args, **kwargs):
+        if calls.fail:
+            calls.fail -= 1
+            raise OSError("disk full")
+        calls.append(path)
+        return real(path, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "atomic_write", recording)
+    return calls
+
+
+@pytest.fixture
+def csv_store(tmp_path):
+    return CsvStorage(str(tmp_path / "scores.csv"), str(tmp_path / "teams.csv"), str(tmp_path / "phases.json"),
+                      write_behind=True)
+
+
+def file_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def run(coro_fn, store):
+    async def main():
+        ex = make_io_executor(2)
+        try:
+            return await coro_fn(DataAccess(store, ex))
+        finally:
+            ex.shutdown(wait=True)
+    return asyncio.run(main())
+
+
+def test_burst_costs_one_rewrite(csv_store, writes):
+    async def burst(dal):
+        await asyncio.gather(*(dal.save_phase_score(u, f"u{u}", WEEK, "phase1", u) for u in range(50)))
+        assert writes == []                     # nothing written until the flush
+        assert csv_store.pending() == ("scores",)
+        await dal.flush()
+
+    run(burst, csv_store)
+    assert writes == [csv_store.scores_file]
+    assert len(file_rows(csv_store.scores_file)) == 50
+    assert csv_store.pending() == ()
+
+
+def test_failed_flush_stays_dirty_and_is_retried(csv_store, writes):
+    writes.fail = 1
+
+    async def flush_twice(dal):
+        await dal.save_phase_score(1, "a", WEEK, "phase1", 10)
+        with pytest.raises(OSError):
+            await dal.flush()
+        assert csv_store.pending() == ("scores",)
+        await dal.flush()
+
+    run(flush_twice, csv_store)
+    assert writes == [csv_store.scores_file]
+    assert file_rows(csv_store.scores_file)[0]["phase1"] == "10"
+    assert csv_store.pending() == ()
+
+
+def test_close_flushes_every_dirty_file(csv_store, writes):
+    async def change_all(dal):
+        await dal.save_phase_score(1, "a", WEEK, "phase2", 7)
+        await dal.save_team(1, "a", "Phase", 0, 0, 0)
+        await dal.set_week_phases(WEEK, "Phase", "Other")
+        dal.close()
+
+    run(change_all, csv_store)
+    assert sorted(writes) == sorted([csv_store.scores_file, csv_store.teams_file, csv_store.phases_file])
+    assert csv_store.pending() == ()
+    assert file_rows(csv_store.scores_file)[0]["total"] == "7"
+    assert file_rows(csv_store.teams_file)[0]["phase"] == "Phase"
+    reopened = CsvStorage(csv_store.scores_file, csv_store.teams_file, csv_store.phases_file)
+    assert reopened.load_phases() == {WEEK: {"phase1": "Phase", "phase2": "Other"}}
+
+
+def test_without_write_behind_every_change_is_written(tmp_path):
+    store = CsvStorage(str(tmp_path / "scores.csv"), str(tmp_path / "teams.csv"), str(tmp_path / "phases.json"))
+    store.save_phase_score(1, "a", WEEK, "phase1", 3)
+    assert store.pending() == ()
+    assert file_rows(store.scores_file)[0]["phase1"] == "3"
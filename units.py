@@ -0,0 +1,126 @@
+import csv, os
+from array import array
+from dataclasses import dataclass
+
+from metrics import add_io_bytes, instrument_io
+from phase_index import PhaseIndex
+from records import unit_ids
+
+
+# ========= UNITS FILE PARSING =========
+@instrument_io("load_units_index")
+def load_units_index(path: str):
+    """
+    Build an index: { phase_name_lower: {"Name": "Phase Name", "Lead": [...], "Side": [...]} }
+    Role 'Side' contains only Side rows; we'll add Leads when choosing sides.
+    """
+    index = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        add_io_bytes("load_units_index", read=os.fstat(f.fileno()).st_size)
+        reader = csv.reader(f)
+        header = next(reader, None)
+        # If the first row looks like headers, ignore it; otherwise treat it as data
+        def looks_like_header(row):
+            joined = ",".join([c.lower() for c in row])
+            return "phase" in joined and "role" in joined and "unit" in joined
+        if header and not looks_like_header(header):
+            # header was actually data
+            f.seek(0)
+            reader = csv.reader(f)
+
+        for row in reader:
+            if len(row) < 5:
+                continue
+            phase, affiliation, rng, role, unit = [c.strip() for c in row[:5]]
+            if not phase or not role or not unit:
+                continue
+            ph_key = phase.lower()
+            if ph_key not in index:
+                index[ph_key] = {"Name": phase, "Lead": [], "Side": []}
+            if role.lower() == "lead":
+                index[ph_key]["Lead"].append(unit)
+            elif role.lower() == "side":
+                index[ph_key]["Side"].append(unit)
+    return index
+
+
+# ========= UNIT CATALOG =========
+@dataclass(frozen=True)
+class PhaseUnits:
+    """A phase's unit pools as array('H') of unit IDs (records.unit_ids), in file order."""
+    name: str         # as first written in units.csv
+    leads: array
+    sides: array
+    side_pool: array  # Side + Lead, the pool side slots draw from
+
+
+class UnitCatalog:
+    """
+    Process-wide cache of units.csv. The file is parsed once and only
+    re-parsed when its mtime/size changes or reload() is forced. `index`
+    (phase-name autocomplete) is rebuilt with it and never touches disk.
+
+    Lookups only read the cached state: reload() is blocking and belongs on
+    the I/O executor (the bot's units watcher). The one exception is a
+    catalog that was never built, which lookups load once on first use.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._phases = {}
+        self._signature = None
+        self.index = PhaseIndex()
+        self.builds = 0
+        self.lookups = 0
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self, force: bool = False):
+        sig = self._file_signature()
+        if not force and sig == self._signature and self.builds:
+            return False
+        index = load_units_index(self.path) if sig else {}
+        phases = {}
+        for key, rec in index.items():
+            leads = unit_ids.ids(rec["Lead"])
+            sides = unit_ids.ids(rec["Side"])
+            phases[key] = PhaseUnits(name=rec["Name"], leads=leads, sides=sides, side_pool=sides + leads)
+        self._phases = phases
+        self.index = PhaseIndex(p.name for p in phases.values())
+        self._signature = sig
+        self.builds += 1
+        return True
+
+    def _ensure_loaded(self):
+        if not self.builds:
+            self.reload()
+
+    def get(self, phase_name: str):
+        """Return the PhaseUnits for a phase (case-insensitive), or None."""
+        self._ensure_loaded()
+        self.lookups += 1
+        return self._phases.get(phase_name.lower())
+
+    def resolve(self, phase_name: str):
+        """Canonical phase name for user input (case/spacing/unique prefix), or None."""
+        self._ensure_loaded()
+        return self.index.resolve(phase_name)
+
+    def phase_keys(self):
+        self._ensure_loaded()
+        return list(self._phases)
+
+    def counts(self):
+        self._ensure_loaded()
+        return {
+            "phases": len(self._phases),
+            "leads": sum(len(p.leads) for p in self._phases.values()),
+            "sides": sum(len(p.sides) for p in self._phases.values()),
+            "builds": self.builds,
+            "lookups": self.lookups,
+        }